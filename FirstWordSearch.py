@@ -2,61 +2,107 @@
 Search for best starting word.
 M. Palmer 3/2022
 """
+import argparse
 import random
 import time
 from matching import *
+from corpus import load_corpus
+from pattern_matrix import load_pattern_matrix
+from parallel_search import parallel_rank_guesses
+import profiling
 
 N_RANDOM_WORDLE = 500
 use_random_wordles = False
 
+
+def _psetup():
+    parser = argparse.ArgumentParser(description='Wordle First Word Search')
+    parser.add_argument('-j', type=int, default=1, help='Number of worker processes (0 = all cores)')
+    parser.add_argument('--objective', choices=OBJECTIVES, default='expected', help='Objective to rank guesses by')
+    parser.add_argument('-o', type=str, default='sm.xlsx', help='Ranked guess output file: .xlsx, .csv or .npy')
+    parser.add_argument('--rows', type=int, default=0, help='Only write the best ROWS guesses (0 = all)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Count calls and time of the hot functions, report at exit (also: WORDLE_PROFILE=1)')
+    parser.add_argument('--monte-carlo', action='store_true',
+                        help='Approximate search on growing wordle samples with successive halving (no spreadsheet)')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for --monte-carlo')
+    parser.add_argument('--top', type=int, default=0,
+                        help='Only find the best TOP guesses by expected remaining list, with branch-and-bound (no spreadsheet)')
+
+    return parser
+
 # the following for testing readability
 C = ST_CORRECT
 E = ST_ELSEWHERE
 R = ST_REJECT
 
-combined_wordlist = [line.strip().upper() for line in open("combined_wordlist.txt")]
-combined_wordlist = sorted(combined_wordlist[1:])  # get rid of first line comment
-
-print('First Word Search started: ', time.asctime())
-
-# Common words requires some processing:
-# - remove duplicates
-# - remove words that are not legal wordles
-common_words = [line.strip().upper() for line in open("common_words.txt")]
-print('Common words = ', len(common_words))
-common_words = list(set(common_words))
-print('Common words (remove duplicates)= ', len(common_words))
-common_words = [w for w in common_words if w in combined_wordlist]
-print('Common words that are legal wordles = ', len(common_words))
-
-
-non_nrl_guesses = remove_non_nrl(combined_wordlist)
-print('reduced guesses len', len(non_nrl_guesses))
-
-t0 = time.time()
-
-if use_random_wordles:
-    random_wordles = [common_words[random.randint(0, N_RANDOM_WORDLE - 1)] for k in range(N_RANDOM_WORDLE)]
-
-    print('Generating first turn list with random wordles, N=', N_RANDOM_WORDLE)
-    first_word_search_wordles = random_wordles
-else:
-    print('Generating first turn list with all  common word wordles, N=', len(common_words))
-    first_word_search_wordles = common_words
-
-guesses = non_nrl_guesses
-#current_list = nrl_wordlist
-current_list = common_words
-
-nrl_flag = False
-
-list_lens = measure_list_reduction(first_word_search_wordles, guesses, current_list, nrl_flag, tick_lines=1)
-min_ndx = list_lens.index(min(list_lens))
-print('Minimum avg remaining list of %.1f for %s' % (list_lens[min_ndx], guesses[min_ndx]))
-
-t1 = time.time()
-print('Elapsed %.1f sec' % (t1 - t0))
-
-save_ranked_guesses(guesses, list_lens, 'sm.xlsx')
-
-
+# guarded so that pool workers (spawn start method) can re-import this script safely
+if __name__ == "__main__":
+    args = _psetup().parse_args()
+    profiling.setup(args.profile)
+
+    combined = load_corpus('combined')
+    combined_wordlist = combined.words
+
+    print('First Word Search started: ', time.asctime())
+
+    # common words in usage order, duplicates and words that are not legal wordles removed
+    common_words = load_corpus('common').words
+    print('Common words that are legal wordles = ', len(common_words))
+
+    non_nrl_guesses = combined.nrl_words()
+    print('reduced guesses len', len(non_nrl_guesses))
+
+    with profiling.stage('pattern matrix'):
+        pmatrix = load_pattern_matrix(combined_wordlist, combined_wordlist)
+
+    t0 = time.time()
+
+    if use_random_wordles:
+        random_wordles = [common_words[random.randint(0, N_RANDOM_WORDLE - 1)] for k in range(N_RANDOM_WORDLE)]
+
+        print('Generating first turn list with random wordles, N=', N_RANDOM_WORDLE)
+        first_word_search_wordles = random_wordles
+    else:
+        print('Generating first turn list with all  common word wordles, N=', len(common_words))
+        first_word_search_wordles = common_words
+
+    guesses = non_nrl_guesses
+    #current_list = nrl_wordlist
+    current_list = common_words
+
+    if args.monte_carlo:
+        with profiling.stage('monte carlo', len(guesses)):
+            ranked, p_winner, work = monte_carlo_search(first_word_search_wordles, guesses, current_list,
+                                                        pmatrix=pmatrix, seed=args.seed)
+        for avg, se, guess in ranked[:10]:
+            print('%s %.2f +- %.2f' % (guess, avg, se))
+        print('P(%s is the exact winner) = %.3f' % (ranked[0][2], p_winner))
+        print('Elapsed %.1f sec, %.0f%% of the patterns computed' % (time.time() - t0, 100.0 * work))
+        exit()
+
+    if args.top > 0:
+        with profiling.stage('branch and bound', len(guesses)):
+            ranked, work = branch_and_bound_search(first_word_search_wordles, guesses, current_list, args.top, pmatrix=pmatrix)
+        for avg, guess in ranked:
+            print('%s %.2f' % (guess, avg))
+        print('Elapsed %.1f sec, %.0f%% of the patterns computed' % (time.time() - t0, 100.0 * work))
+        exit()
+
+    # all objectives come out of the same pass; --objective only picks the ranking
+    with profiling.stage('rank guesses', len(guesses)):
+        if args.j == 1:
+            scores = rank_guesses(first_word_search_wordles, guesses, current_list, tick_lines=1, pmatrix=pmatrix)
+        else:
+            n_workers = args.j if args.j > 0 else None
+            scores = parallel_rank_guesses(first_word_search_wordles, guesses, current_list, n_workers, pmatrix=pmatrix)
+
+    best_ndx = best_guess_index(scores, args.objective)
+    print('Best %s of %.1f for %s (avg remaining list %.1f)' %
+          (args.objective, scores[args.objective][best_ndx], guesses[best_ndx], scores['expected'][best_ndx]))
+
+    t1 = time.time()
+    print('Elapsed %.1f sec' % (t1 - t0))
+
+    with profiling.stage('export', len(guesses)):
+        save_ranked_guesses(guesses, scores, args.o, args.objective, args.rows or None)
@@ -1,95 +1,157 @@
 """
-routines for wordle match logic.
-Terminology:
-    wordle : str, 5-letter
-        the truth
-    guess : str, 5-letter
-        the word to test for a match to the wordle
-    state : list if int
-    `   results of testing the guess against match.  each letter is
-        ST_CORRECT : (green) correct letter in correct position
-        ST_ELSEWHERE : (gold) this letter needs to be moved to be correct
-        ST_REJECT : (grey) letter not in word
-
-    paint : test a guess against a wordle, the results of which is a state
-
-    filter : given a guess and a state, test whether a candidate wordle matches.  This
-        is the inverse of paint.
-"""
-import time
-from matching import *
+Play the solver automatically against hidden wordles and report how it does.
 
+Every word in shuffled_real_wordles.txt (or a random sample, -n) is played as the hidden
+wordle, starting from the opener (-f) and then taking solver.Solver's choice each turn -
+the SubsequentMove.py objective, lowest average remaining list length.  Games are split
+over a process pool (-j); positions shared between games are solved once per process.
+With --hard every guess follows hard-mode rules (greens kept, revealed letters reused).
 
-# the following for testing readability
-C = ST_CORRECT
-E = ST_ELSEWHERE
-R = ST_REJECT
-
-"""
+Reports the guess-count distribution, games not solved within six turns and games per
+second, e.g.
 
-So simulate the next level search that would follow this move
- - reduce the wordlist to words that can fit the Status.  
- - Reduce it further by keeping only NRL words
- - Obtain a reduced set of wordles by filtering from common words, only the wordles that fit the Status.
- - obtain a reduced guess list that includes only NRL words - for probe moves, only interested in those
- - benchmark a search for best subseqent move
+    python Simulate.py -j 0
+    python Simulate.py -n 200 --seed 1 --wordlist combined
+    python Simulate.py -j 0 --hard
 """
+import argparse
+import multiprocessing as mp
+import os
+import random
+import time
 
-combined_wordlist = [line.strip().upper() for line in open("combined_wordlist.txt")]
-combined_wordlist = sorted(combined_wordlist[1:])  # get rid of first line comment
+import numpy as np
 
-# Common words requires some processing:
-# - remove duplicates
-# - remove words that are not legal wordles
-common_words = [line.strip().upper() for line in open("common_words.txt")]
-print('Common words = ', len(common_words))
-common_words = list(set(common_words))
-print('Common words (remove duplicates)= ', len(common_words))
-common_words = [w for w in common_words if w in combined_wordlist]
-print('Common words that are legal wordles = ', len(common_words))
+from corpus import load_corpus
+from pattern_matrix import load_pattern_matrix
+from solver import Solver
+import profiling
 
+DEFAULT_FIRST_WORD = 'LARES'
+MAX_TURNS = 6
+PLAY_TURNS = 10  # games keep going past MAX_TURNS so a failure shows how far off it was
+CHUNK_GAMES = 50
 
-non_nrl_guesses = remove_non_nrl(combined_wordlist)
-print('reduced guesses len', len(non_nrl_guesses))
+_solver = None  # per process, see make_solver / _init_worker
 
 
-first_guess = 'LEARS'
-status = [R, R, E, R, R]
-#first_guess = 'CRANE'
-#first_guess = 'SOARE'
-#status = paint_guess('SWEET', first_guess)
+def load_answers(which):
+    """
+    the answer list: 'real' (shuffled_real_wordles.txt) or 'common' (common_words.txt)
+    """
+    return load_corpus(which).words
 
-reduced_wordlist = filter_word_list(combined_wordlist, first_guess, status)
-print('reduced list len = ', len(reduced_wordlist))
-#print(sorted(reduced_wordlist))
 
-reduced_wordles = filter_word_list(common_words, first_guess, status)
-print('reduced wordles len', len(reduced_wordles))
-# print(sorted(reduced_wordles))
+def make_solver(answers_from, wordlist_from):
+    """
+    build the Solver used for a simulation.  wordlist_from is 'answers' to score guesses over
+    the remaining answers only, or 'combined' to score over all remaining legal words as
+    SubsequentMove.py does.
+    """
+    combined = load_corpus('combined')
+    combined_wordlist = combined.words
+    answers = load_answers(answers_from)
 
-while(1):
-    non_nrl_wordlist = remove_non_nrl(reduced_wordlist)
-    #print('Non NRL list len = ', len(non_nrl_wordlist))
+    non_nrl_guesses = combined.nrl_words()
+    pmatrix = load_pattern_matrix(combined_wordlist, combined_wordlist)
 
+    wordlist = combined_wordlist if wordlist_from == 'combined' else answers
+    return Solver(pmatrix, non_nrl_guesses, answers, wordlist)
 
-    t0 = time.time()
 
-    guesses = non_nrl_guesses
-    #wordlist = non_nrl_wordlist
-    wordlist = reduced_wordlist
+def _init_worker(config):
+    global _solver
+    if _solver is None:  # inherited from the parent when the pool forks
+        _solver = make_solver(*config)
 
-    list_lens = measure_list_reduction(reduced_wordles, guesses, wordlist, False)
-    min_ndx = list_lens.index(min(list_lens))
-    print('Minimum avg remaining list of %.1f for %s' % (list_lens[min_ndx], guesses[min_ndx]))
 
-    word_played = guesses[min_ndx]
-    status = paint_guess(hidden_wordle, word_played)
+def _play_chunk(args):
+    """
+    number of guesses for each wordle in the chunk, 0 if it wasn't solved within PLAY_TURNS
+    """
+    wordles, opener, hard = args
+    turns = []
+    for wordle in wordles:
+        played = _solver.play(wordle, opener, PLAY_TURNS, hard)
+        turns += [len(played) if played[-1] == wordle else 0]
+    return turns
 
-    reduced_wordlist = filter_word_list(reduced_wordlist, word_played, status)
-    print('reduced list len = ', len(reduced_wordlist))
 
-    reduced_wordles = filter_word_list(reduced_wordlist, word_played, status)
-    print('reduced wordles len', len(reduced_wordles))
+def simulate(config, wordles, opener, n_workers=1, hard=False):
+    """
+    play every wordle, returning the list of guess counts (0 = not solved)
+    """
+    global _solver
+    t0 = time.time()
+    with profiling.stage('solver setup'):
+        _solver = make_solver(*config)
+    print('Solver ready in %.1f sec' % (time.time() - t0))
+
+    chunks = [(wordles[k:k + CHUNK_GAMES], opener, hard) for k in range(0, len(wordles), CHUNK_GAMES)]
+
+    turns = []
+    if n_workers == 1:
+        for chunk in chunks:
+            turns += _play_chunk(chunk)
+            print('%5.5d' % len(turns), end='\r')
+    else:
+        with mp.Pool(n_workers, initializer=_init_worker, initargs=(config,)) as pool:
+            for chunk_turns in pool.imap(_play_chunk, chunks):
+                turns += chunk_turns
+                print('%5.5d' % len(turns), end='\r')
+
+    print('%5.5d' % len(turns))
+    return turns
+
+
+def report(turns, elapsed):
+    turns = np.array(turns)
+    solved = turns[turns > 0]
+
+    print('Games: %d' % len(turns))
+    for n in range(1, PLAY_TURNS + 1):
+        count = int(np.count_nonzero(turns == n))
+        if count > 0:
+            print('  %2d guesses: %5d  %5.1f%%' % (n, count, 100.0 * count / len(turns)))
+
+    print('Average guesses (solved games): %.3f' % float(np.mean(solved)))
+    print('Failures (more than %d guesses): %d' % (MAX_TURNS, int(np.count_nonzero((turns > MAX_TURNS) | (turns == 0)))))
+    print('Not solved within %d guesses: %d' % (PLAY_TURNS, int(np.count_nonzero(turns == 0))))
+    print('Elapsed %.1f sec, %.1f games/sec' % (elapsed, len(turns) / elapsed))
+
+
+def _psetup():
+    parser = argparse.ArgumentParser(description='Wordle Solver Simulation')
+    parser.add_argument('-f', type=str, default=DEFAULT_FIRST_WORD, help='First guess word')
+    parser.add_argument('-n', type=int, default=0, help='Number of wordles to sample (0 = all)')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for the sample')
+    parser.add_argument('-j', type=int, default=1, help='Number of worker processes (0 = all cores)')
+    parser.add_argument('--answers', choices=['real', 'common'], default='real',
+                        help='Hidden wordles and solver answer list: shuffled_real_wordles.txt or common_words.txt')
+    parser.add_argument('--hard', action='store_true', help='Play by hard-mode rules')
+    parser.add_argument('--profile', action='store_true',
+                        help='Count calls and time of the hot functions (use with -j 1), report at exit (also: WORDLE_PROFILE=1)')
+    parser.add_argument('--wordlist', choices=['answers', 'combined'], default='answers',
+                        help='Words counted as remaining when scoring a guess')
+
+    return parser
+
+
+if __name__ == "__main__":
+    args = _psetup().parse_args()
+    profiling.setup(args.profile)
+
+    config = (args.answers, args.wordlist)
+    wordles = load_answers(args.answers)
+    if args.n > 0:
+        random.seed(args.seed)
+        wordles = random.sample(wordles, args.n)
+
+    n_workers = args.j if args.j > 0 else os.cpu_count()
+    print('Simulating %d games, first word %s, %d worker(s)%s' % (len(wordles), args.f, n_workers,
+                                                                  ', hard mode' if args.hard else ''))
 
-    t1 = time.time()
-    print('Elapsed %.1f sec' % (t1 - t0))
+    t0 = time.time()
+    with profiling.stage('play games', len(wordles)):
+        turns = simulate(config, wordles, args.f.upper(), n_workers, args.hard)
+    report(turns, time.time() - t0)
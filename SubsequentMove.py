@@ -18,6 +18,11 @@ Terminology:
 """
 import time
 from matching import *
+from corpus import load_corpus, load_word_list
+from pattern_matrix import load_pattern_matrix
+from decision_tree import DecisionTree
+from solver import Solver
+import profiling
 import argparse
 
 # the following for testing readability
@@ -40,77 +45,147 @@ def _psetup():
     parser = argparse.ArgumentParser(description='Wordle Subsequent Move Search')
     parser.add_argument('fb', help='Feedback - String of E, C, R to code response to first guess')
     parser.add_argument('-f', type=str, default=DEFAULT_FIRST_WORD,  help='First guess word that was entered')
+    parser.add_argument('--objective', choices=OBJECTIVES, default='expected', help='Objective to rank guesses by')
+    parser.add_argument('-o', type=str, default='sm.xlsx', help='Ranked guess output file: .xlsx, .csv or .npy')
+    parser.add_argument('--rows', type=int, default=0, help='Only write the best ROWS guesses (0 = all)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Count calls and time of the hot functions, report at exit (also: WORDLE_PROFILE=1)')
+    parser.add_argument('--top', type=int, default=0,
+                        help='Only find the best TOP guesses by expected remaining list, with branch-and-bound (no spreadsheet)')
+    parser.add_argument('--depth', type=int, choices=[1, 2], default=1,
+                        help='Search depth: 2 scores each guess with the best follow-up for every feedback')
+    parser.add_argument('--time-budget', type=float, default=None,
+                        help='Seconds to search for; prints the best guesses found in that time (no spreadsheet)')
+    parser.add_argument('--cache', type=str, default=None,
+                        help='With --depth 2, keep solved positions in this file between runs (e.g. positions.npz)')
+    parser.add_argument('--hard', action='store_true',
+                        help='Hard mode: only rank guesses that keep the greens and reuse the revealed letters')
+    parser.add_argument('--words', type=str, default=None,
+                        help='Dictionary file for another word length (that of -f), e.g. a 6-letter variant; patterns are painted as needed')
+    parser.add_argument('--tree', type=str, default=None, help='Look the move up in a decision tree file (see decision_tree.py) instead of searching')
 
     return parser
 
 args = _psetup().parse_args()
-
-combined_wordlist = [line.strip().upper() for line in open("combined_wordlist.txt")]
-combined_wordlist = sorted(combined_wordlist[1:])  # get rid of first line comment
-
-# Common words requires some processing:
-# - remove duplicates
-# - remove words that are not legal wordles
-common_words = [line.strip().upper() for line in open("common_words.txt")]
-print('Common words = ', len(common_words))
-common_words = list(set(common_words))
-print('Common words (remove duplicates)= ', len(common_words))
-common_words = [w for w in common_words if w in combined_wordlist]
-print('Common words that are legal wordles = ', len(common_words))
-
-
-non_nrl_guesses = remove_non_nrl(combined_wordlist)
-print('reduced guesses len', len(non_nrl_guesses))
-
+profiling.setup(args.profile)
 
 first_guess = args.f
 print('First Word: ', first_guess)
 
-if len(args.fb) != 5:
-    print('Feedback string must be 5 characters')
+try:
+    status = parse_feedback(args.fb, len(first_guess))
+except ValueError as e:
+    print(e)
     exit()
-status = []
-for fbl in args.fb:
-    if fbl == 'R':
-        status += [R]
-    elif fbl == 'E':
-        status += [E]
-    elif fbl == 'C':
-        status += [C]
+
+print('Status: ', status)
+
+if args.tree is not None:
+    tree = DecisionTree(args.tree)
+    t0 = time.time()
+    next_guess = tree.next_guess([(first_guess, status)])
+    t1 = time.time()
+    if next_guess is None:
+        print('%s / %s is not in the tree (opener %s)' % (first_guess, args.fb, tree.opener))
     else:
-        print('Illegal character <%s> in status word' % fbl)
+        print('Tree recommends %s (lookup %.1f usec)' % (next_guess, (t1 - t0) * 1e6))
+    exit()
+
+if args.words is not None:
+    # every word of the dictionary is a guess and a possible wordle; no pattern matrix, the
+    # searches paint the patterns in blocks so memory stays bounded for long words
+    if args.depth == 2:
+        print('--depth 2 needs the pattern matrix of the bundled 5-letter lists')
         exit()
+    combined = common = load_word_list(args.words, len(first_guess))
+    print('%d-letter words = ' % combined.length, len(combined))
+    pmatrix = None
+else:
+    combined = load_corpus('combined')
+    # common words in usage order, duplicates and words that are not legal wordles removed
+    common = load_corpus('common')
+    print('Common words that are legal wordles = ', len(common.words))
+
+combined_wordlist = combined.words
+common_words = common.words
+
+non_nrl_guesses = combined.nrl_words()
+print('reduced guesses len', len(non_nrl_guesses))
 
-print('Status: ', status)
+if args.words is None:
+    with profiling.stage('pattern matrix'):
+        pmatrix = load_pattern_matrix(combined_wordlist, combined_wordlist)
 
 #first_guess = 'CRANE'
 #first_guess = 'SOARE'
 #status = paint_guess('SWEET', first_guess)
 
-reduced_wordlist = filter_word_list(combined_wordlist, first_guess, status)
+constraint = compile_constraint(first_guess, status)
+
+with profiling.stage('filter', len(combined_wordlist)):
+    reduced_wordlist = constraint.filter(combined_wordlist, combined.packed)
 print('reduced list len = ', len(reduced_wordlist))
 #print(sorted(reduced_wordlist))
 
 non_nrl_wordlist = remove_non_nrl(reduced_wordlist)
 #print('Non NRL list len = ', len(non_nrl_wordlist))
 
-reduced_wordles = filter_word_list(common_words, first_guess, status)
+reduced_wordles = constraint.filter(common_words, common.packed)
 print('reduced wordles len', len(reduced_wordles))
 #print(sorted(reduced_wordles))
 
 t0 = time.time()
 
 guesses = non_nrl_guesses
+if args.hard:
+    # any legal word that obeys the feedback, repeated letters included
+    with profiling.stage('hard mode guesses', len(combined_wordlist)):
+        hard = GuessIndex(combined.packed).hard_mode(constraint)
+    guesses = [combined_wordlist[k] for k in np.nonzero(hard)[0]]
+    print('hard mode guesses len', len(guesses))
+
+if args.depth == 2:
+    solver = Solver(pmatrix, guesses, common_words, combined_wordlist)
+    if args.cache is not None:
+        print('%d solved positions loaded from %s' % (solver.load_table(args.cache), args.cache))
+    with profiling.stage('lookahead'):
+        ranked = solver.lookahead(solver.position(reduced_wordles, reduced_wordlist))
+    for two_ply, one_ply, g in ranked:
+        print('%s two-ply %.2f one-ply %.2f' % (solver.words[g], two_ply, one_ply))
+    if args.cache is not None:
+        solver.save_table(args.cache)
+        print('%d solved positions saved (%d hits, %d misses)' % (len(solver.table), solver.table.hits, solver.table.misses))
+    print('Elapsed %.1f sec' % (time.time() - t0))
+    exit()
+
+if args.time_budget is not None:
+    top, n_scored = top_guesses_within(reduced_wordles, guesses, reduced_wordlist, args.time_budget,
+                                       objective=args.objective, pmatrix=pmatrix)
+    for score, guess in top:
+        print('%s %.2f' % (guess, score))
+    print('Scored %d of %d guesses, elapsed %.2f sec' % (n_scored, len(guesses), time.time() - t0))
+    exit()
+
+if args.top > 0:
+    with profiling.stage('branch and bound', len(guesses)):
+        ranked, work = branch_and_bound_search(reduced_wordles, guesses, reduced_wordlist, args.top, pmatrix=pmatrix)
+    for avg, guess in ranked:
+        print('%s %.2f' % (guess, avg))
+    print('Elapsed %.1f sec, %.0f%% of the patterns computed' % (time.time() - t0, 100.0 * work))
+    exit()
 
-list_lens = measure_list_reduction(reduced_wordles, guesses, reduced_wordlist, False)
+with profiling.stage('rank guesses', len(guesses)):
+    scores = rank_guesses(reduced_wordles, guesses, reduced_wordlist, pmatrix=pmatrix)
 
-min_ndx = list_lens.index(min(list_lens))
-print('Minimum avg remaining list of %.1f for %s' % (list_lens[min_ndx], guesses[min_ndx]))
+best_ndx = best_guess_index(scores, args.objective)
+print('Best %s of %.1f for %s (avg remaining list %.1f)' %
+      (args.objective, scores[args.objective][best_ndx], guesses[best_ndx], scores['expected'][best_ndx]))
 
 
 t1 = time.time()
 print('Elapsed %.1f sec' % (t1 - t0))
 
-save_ranked_guesses(guesses, list_lens, 'sm.xlsx')
+with profiling.stage('export', len(guesses)):
+    save_ranked_guesses(guesses, scores, args.o, args.objective, args.rows or None)
 
 
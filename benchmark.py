@@ -0,0 +1,181 @@
+"""
+Benchmarks for the matching.py / stats.py hot paths and a few end-to-end scenarios.
+
+Each case is timed on realistic inputs drawn from the bundled word lists with fixed random
+seeds (including the random_wordles sampling used by matching.py and FirstWordSearch.py),
+so runs are comparable.  Results are compared against a stored baseline and cases that got
+slower by more than the threshold are flagged:
+
+    python benchmark.py --save          # record benchmark_baseline.json
+    python benchmark.py                 # compare against it, exit status 1 on regression
+    python benchmark.py -k filter       # only cases whose name contains 'filter'
+
+Times are the best of --repeat runs, per call of the case.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+from corpus import load_corpus
+from matching import *
+from pattern_matrix import load_pattern_matrix
+from stats import WordScorer, score_words, sort_by_score
+
+BASELINE_FILE = 'benchmark_baseline.json'
+REGRESSION_THRESHOLD = 1.25  # flag cases slower than baseline by this factor
+SEED = 2022
+N_RANDOM_WORDLE = 500
+N_PAIRS = 20000
+
+
+def load_lists():
+    return load_corpus('combined').words, sorted(load_corpus('common').words)
+
+
+def make_cases(combined_wordlist, common_words):
+    """
+    return a list of (name, function) pairs; each function runs one timed call of the case
+    """
+    rng = random.Random(SEED)
+
+    random.seed(SEED)  # same sampling as matching.py's random_wordles
+    random_wordles = [common_words[random.randint(0, N_RANDOM_WORDLE - 1)] for k in range(N_RANDOM_WORDLE)]
+
+    nrl_wordlist = remove_non_nrl(combined_wordlist)
+    pairs = [(rng.choice(common_words), rng.choice(combined_wordlist)) for k in range(N_PAIRS)]
+    states = [(guess, paint_guess(wordle, guess)) for wordle, guess in pairs]
+    nrl_pairs = [(rng.choice(nrl_wordlist), rng.choice(nrl_wordlist)) for k in range(N_PAIRS)]
+    nrl_states = [(guess, paint_guess(wordle, guess)) for wordle, guess in nrl_pairs]
+    words = [rng.choice(combined_wordlist) for k in range(N_PAIRS)]
+
+    pmatrix = load_pattern_matrix(combined_wordlist, combined_wordlist)
+
+    # SubsequentMove.py example: LARES, feedback RRERR
+    sm_guess, sm_status = 'LARES', [ST_REJECT, ST_REJECT, ST_ELSEWHERE, ST_REJECT, ST_REJECT]
+    sm_wordlist = filter_word_list(combined_wordlist, sm_guess, sm_status)
+    sm_wordles = filter_word_list(common_words, sm_guess, sm_status)
+    guesses = remove_non_nrl(combined_wordlist)
+    guess_subset = rng.sample(guesses, 500)
+
+    # GUI example: two rows entered against the wordle POINT
+    gui_rows = [(g, paint_guess('POINT', g)) for g in ['LARES', 'COUNT']]
+    packed_words = pack_words(combined_wordlist)
+    scorer = WordScorer(combined_wordlist)
+
+    def paint():
+        for wordle, guess in pairs:
+            paint_guess(wordle, guess)
+
+    def filt():
+        for (guess, st), word in zip(states, words):
+            filter_guess(word, guess, st)
+
+    def filt_nrl():
+        for (guess, st), (word, _) in zip(nrl_states, nrl_pairs):
+            filter_guess_nrl(word, guess, st)
+
+    def filt_list():
+        filter_word_list(combined_wordlist, sm_guess, sm_status)
+
+    def reduce_power():
+        reducing_power(sm_wordles[:50], 'CRANE', sm_wordlist, False)
+
+    def reduce_power_partition():
+        partition_reducing_power(random_wordles, 'CRANE', nrl_wordlist)
+
+    def scores():
+        score_words(combined_wordlist)
+
+    def many():
+        paint_many(guess_subset, common_words)
+
+    def first_word_subset():
+        partition_list_reduction(random_wordles, guess_subset, common_words, tick_lines=None, pmatrix=pmatrix)
+
+    def subsequent_move():
+        constraint = compile_constraint(sm_guess, sm_status)
+        wordlist = constraint.filter(combined_wordlist, packed_words)
+        wordles = constraint.filter(common_words)
+        partition_list_reduction(wordles, guesses, wordlist, tick_lines=None, pmatrix=pmatrix)
+
+    def gui_update_list():
+        newlist, packed = combined_wordlist, packed_words
+        for guess, state in gui_rows:
+            newlist, packed = compile_constraint(guess, state).reduce(newlist, packed)
+        sort_by_score(newlist, scorer.scores(newlist))
+        scorer.set_words([])  # next call starts from scratch again
+
+    return [
+        ('paint_guess x%d' % N_PAIRS, paint),
+        ('filter_guess x%d' % N_PAIRS, filt),
+        ('filter_guess_nrl x%d' % N_PAIRS, filt_nrl),
+        ('filter_word_list full list', filt_list),
+        ('reducing_power 50 wordles', reduce_power),
+        ('partition_reducing_power random_wordles', reduce_power_partition),
+        ('score_words full list', scores),
+        ('paint_many 500 x common', many),
+        ('first word search 500 guesses', first_word_subset),
+        ('SubsequentMove LARES RRERR', subsequent_move),
+        ('GUI update_list 2 rows', gui_update_list),
+    ]
+
+
+def time_case(fn, repeat):
+    best = None
+    for k in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        if best is None or dt < best:
+            best = dt
+    return best
+
+
+def _psetup():
+    parser = argparse.ArgumentParser(description='Wordle Solver Benchmarks')
+    parser.add_argument('-k', type=str, default='', help='Only run cases whose name contains this string')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case (best is kept)')
+    parser.add_argument('--save', action='store_true', help='Write the results as the new baseline')
+    parser.add_argument('--baseline', type=str, default=BASELINE_FILE, help='Baseline file')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='Flag cases slower than baseline by this factor')
+
+    return parser
+
+
+if __name__ == "__main__":
+    args = _psetup().parse_args()
+
+    combined_wordlist, common_words = load_lists()
+    cases = [(name, fn) for name, fn in make_cases(combined_wordlist, common_words) if args.k in name]
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        baseline = json.load(open(args.baseline))
+
+    results = {}
+    regressions = []
+    print('%-42s %12s %12s %8s' % ('case', 'sec', 'baseline', 'ratio'))
+    for name, fn in cases:
+        results[name] = time_case(fn, args.repeat)
+
+        if name in baseline:
+            ratio = results[name] / baseline[name]
+            flag = '  SLOWER' if ratio > args.threshold else ''
+            print('%-42s %12.6f %12.6f %8.2f%s' % (name, results[name], baseline[name], ratio, flag))
+            if ratio > args.threshold:
+                regressions += [name]
+        else:
+            print('%-42s %12.6f %12s %8s' % (name, results[name], '-', '-'))
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print('Baseline written to', args.baseline)
+    elif len(regressions) > 0:
+        print('%d regression(s): %s' % (len(regressions), ', '.join(regressions)))
+        sys.exit(1)
@@ -0,0 +1,163 @@
+"""
+Shared loader for the bundled word lists.
+
+Each list is converted once into a compact binary file that is memory-mapped on later
+loads.  A file holds one record per word:
+
+    letters : L x uint8   letter codes as pack_words (A = 0 ... Z = 25), L = 5 here
+    nrl     : bool        True if the word has no repeated letters (see remove_non_nrl)
+    rank    : int32       position in common_words.txt (usage order), UNRANKED if absent
+
+The lists, as the scripts used to build them by hand:
+
+    combined   combined_wordlist.txt, sorted - every legal guess
+    common     common_words.txt in usage order, duplicates and illegal words removed
+    real       shuffled_real_wordles.txt in file order
+
+A corpus file is rebuilt only when one of the source .txt files has changed (size or
+modification time), so a normal start-up is just a few memory maps.
+
+load_word_list() does the same for any other dictionary of one word length (see
+matching.MIN_WORD_LEN / MAX_WORD_LEN), e.g. for 6- to 8-letter variants: its words are
+the legal guesses and the answers, unranked.
+"""
+import json
+import os
+
+import numpy as np
+
+from matching import MAX_WORD_LEN, MIN_WORD_LEN, pack_words
+from stats import UNRANKED
+
+CORPUS_SOURCES = {
+    'combined': 'combined_wordlist.txt',
+    'common': 'common_words.txt',
+    'real': 'shuffled_real_wordles.txt',
+}
+
+
+def corpus_dtype(length=5):
+    return np.dtype([('letters', np.uint8, length), ('nrl', bool), ('rank', np.int32)])
+
+
+def _read_list(filename, length=5):
+    words = [line.strip().upper() for line in open(filename)]
+    return [w for w in words if len(w) == length and w.isalpha() and w.isascii()]  # drops the comment line
+
+
+def _source_key(filenames=CORPUS_SOURCES.values()):
+    key = {}
+    for filename in filenames:
+        st = os.stat(filename)
+        key[filename] = [st.st_size, st.st_mtime_ns]
+    return key
+
+
+def _corpus_words(name):
+    """
+    build the word list for name from the text files
+    """
+    combined = sorted(_read_list(CORPUS_SOURCES['combined']))
+    if name == 'combined':
+        return combined
+
+    legal = set(combined)
+    words = []
+    for w in _read_list(CORPUS_SOURCES[name]):
+        if w in legal:
+            words += [w]
+            legal.discard(w)  # keep first occurrence only
+    return words
+
+
+def _records(words, rank, length=5):
+    records = np.zeros(len(words), dtype=corpus_dtype(length))
+    records['letters'] = pack_words(words, length)
+    records['nrl'] = [len(set(w)) == length for w in words]
+    records['rank'] = [rank.get(w, UNRANKED) for w in words]
+    return records
+
+
+def build_corpus(name, filename):
+    words = _corpus_words(name)
+
+    rank = {}
+    for k, w in enumerate(_read_list(CORPUS_SOURCES['common'])):
+        if w not in rank:
+            rank[w] = k
+
+    np.save(filename, _records(words, rank))
+
+
+class Corpus:
+    """
+    A loaded word list.
+
+    words : list of str
+    length : int, letters per word
+    packed : (N, length) uint8 array, as pack_words(words)
+    nrl : (N,) bool
+    rank : (N,) int32 usage rank
+    index : dict word -> row
+    """
+    def __init__(self, records):
+        self.records = records
+        self.packed = records['letters']
+        self.nrl = records['nrl']
+        self.rank = records['rank']
+        self.length = self.packed.shape[1]
+
+        text = (self.packed + ord('A')).astype(np.uint8).tobytes().decode('ascii')
+        self.words = [text[k:k + self.length] for k in range(0, len(text), self.length)]
+        self.index = {w: k for k, w in enumerate(self.words)}
+
+    def __len__(self):
+        return len(self.words)
+
+    def nrl_words(self):
+        """
+        the words with no repeated letters, same as remove_non_nrl(words)
+        """
+        return [self.words[k] for k in np.nonzero(self.nrl)[0]]
+
+    def usage_rank(self):
+        """
+        dict word -> usage rank, for stats.sort_by_usage
+        """
+        return dict(zip(self.words, self.rank.tolist()))
+
+
+def _load_cached(filename, key, build):
+    """
+    Corpus memory-mapped from filename, first calling build(filename) if the file was
+    built from other sources than key describes
+    """
+    key_file = filename + '.key'
+    current = os.path.exists(filename) and os.path.exists(key_file) and json.load(open(key_file)) == key
+    if not current:
+        build(filename)
+        with open(key_file, 'w') as f:
+            json.dump(key, f)
+
+    return Corpus(np.load(filename, mmap_mode='r'))
+
+
+def load_corpus(name):
+    """
+    load one of the CORPUS_SOURCES lists, rebuilding its binary file if the text changed
+    """
+    filename = os.path.splitext(CORPUS_SOURCES[name])[0] + '.corpus.npy'
+    return _load_cached(filename, _source_key(), lambda f: build_corpus(name, f))
+
+
+def load_word_list(source, length):
+    """
+    load the length-letter words of the text file source (one word per line), sorted with
+    duplicates removed, through a binary file next to it as load_corpus does
+    """
+    if not MIN_WORD_LEN <= length <= MAX_WORD_LEN:
+        raise ValueError('Word length must be %d to %d' % (MIN_WORD_LEN, MAX_WORD_LEN))
+
+    filename = '%s.%d.corpus.npy' % (os.path.splitext(source)[0], length)
+    key = dict(_source_key([source]), length=length)
+    return _load_cached(filename, key, lambda f: np.save(f, _records(sorted(set(_read_list(source, length))), {}, length)))
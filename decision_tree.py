@@ -0,0 +1,157 @@
+"""
+Precomputed full-game decision tree.
+
+Starting from an opener, every feedback pattern that can come back from the answer list is
+followed, and at each node the recommended next guess is found by solver.Solver, with the
+same objective as SubsequentMove.py (lowest average remaining list length).  Nodes are
+stored in a compact .npz file:
+
+    words        the vocabulary of guesses used in the tree
+    node_guess   index into words of the guess recommended at each node (node 0 = opener)
+    edge_parent, edge_pattern, edge_child
+                 for each feedback pattern code seen after node edge_parent, the node reached
+
+Looking up the next move is then a walk of a few dict lookups - see DecisionTree.
+
+To build (a few seconds once the pattern matrix is on disk):
+
+    python decision_tree.py -f LARES --answers real -o tree.npz
+"""
+import argparse
+import time
+
+import numpy as np
+
+from corpus import load_corpus
+from matching import paint_guess
+from pattern_matrix import encode_state, load_pattern_matrix
+from solver import Solver
+
+TREE_FILE = 'tree.npz'
+MAX_DEPTH = 10
+
+
+def build_tree(opener, answers, wordlist, guesses, pmatrix, max_depth=MAX_DEPTH):
+    """
+    build the decision tree for opener.
+
+    answers
+        the possible hidden wordles - the tree has a path for each of them
+    wordlist
+        words counted as still possible when scoring a guess (as reduced_wordlist in
+        SubsequentMove.py); answers should be a subset
+    guesses
+        guess vocabulary; the answers are added to it so the tree can always finish
+
+    returns (words, node_guess, edges) where edges is a list of (parent, pattern, child)
+    """
+    print('Loading guess rows ...')
+    solver = Solver(pmatrix, guesses, answers, wordlist)
+
+    node_guess = [solver.word_pos[opener]]
+    edges = []
+
+    # each stack entry: (node number, position, depth)
+    stack = [(0, solver.start(), 1)]
+
+    while len(stack) > 0:
+        node, position, depth = stack.pop()
+
+        for p, child_position in solver.children(node_guess[node], position):
+            child = len(node_guess)
+            node_guess += [solver.best_guess(child_position)]
+            edges += [(node, p, child)]
+
+            if depth < max_depth:
+                stack += [(child, child_position, depth + 1)]
+
+    return solver.words, node_guess, edges
+
+
+def save_tree(filename, words, node_guess, edges):
+    edges = np.array(edges, dtype=np.int32).reshape(-1, 3)
+    np.savez_compressed(filename,
+                        words=np.array(words, dtype='S5'),
+                        node_guess=np.array(node_guess, dtype=np.int32),
+                        edge_parent=edges[:, 0],
+                        edge_pattern=edges[:, 1].astype(np.uint8),
+                        edge_child=edges[:, 2])
+
+
+class DecisionTree:
+    """
+    Next-move lookups in a tree written by save_tree.
+    """
+    def __init__(self, filename=TREE_FILE):
+        data = np.load(filename)
+        self.words = [w.decode('ascii') for w in data['words']]
+        self.node_guess = data['node_guess'].tolist()
+        self.children = dict(zip(zip(data['edge_parent'].tolist(), data['edge_pattern'].tolist()),
+                                 data['edge_child'].tolist()))
+        self.opener = self.words[self.node_guess[0]]
+
+    def next_guess(self, history):
+        """
+        history is a list of (guess, state) pairs played so far.  Return the recommended
+        next guess, or None if the history leaves the tree (a guess other than the one
+        recommended was played, or the feedback is impossible for the answer list).
+        """
+        node = 0
+        for guess, state in history:
+            if guess != self.words[self.node_guess[node]]:
+                return None
+            node = self.children.get((node, encode_state(state)))
+            if node is None:
+                return None
+
+        return self.words[self.node_guess[node]]
+
+    def play(self, wordle, max_turns=MAX_DEPTH + 1):
+        """
+        list of guesses the tree plays against wordle, ending with wordle if it solves it
+        """
+        played = []
+        history = []
+        while len(played) < max_turns:
+            guess = self.next_guess(history)
+            if guess is None:
+                break
+            played += [guess]
+            if guess == wordle:
+                break
+            history += [(guess, paint_guess(wordle, guess))]
+        return played
+
+
+def _psetup():
+    parser = argparse.ArgumentParser(description='Build Wordle decision tree')
+    parser.add_argument('-f', type=str, default='LARES', help='Opening guess')
+    parser.add_argument('--answers', choices=['real', 'common'], default='real',
+                        help='Answer list: shuffled_real_wordles.txt or common_words.txt')
+    parser.add_argument('-o', type=str, default=TREE_FILE, help='Output tree file')
+
+    return parser
+
+
+if __name__ == "__main__":
+    args = _psetup().parse_args()
+
+    combined = load_corpus('combined')
+    combined_wordlist = combined.words
+
+    answers = sorted(load_corpus(args.answers).words)
+    print('Answers: ', len(answers))
+
+    non_nrl_guesses = combined.nrl_words()
+    pmatrix = load_pattern_matrix(combined_wordlist, combined_wordlist)
+
+    t0 = time.time()
+    words, node_guess, edges = build_tree(args.f.upper(), answers, combined_wordlist, non_nrl_guesses, pmatrix)
+    save_tree(args.o, words, node_guess, edges)
+    print('Tree with %d nodes written to %s in %.1f sec' % (len(node_guess), args.o, time.time() - t0))
+
+    tree = DecisionTree(args.o)
+    turns = [len(tree.play(w)) for w in answers]
+    solved = [tree.play(w)[-1] == w for w in answers]
+    print('Average guesses %.3f, max %d, unsolved %d, more than 6 turns %d' %
+          (np.mean(turns), max(turns), solved.count(False), sum(t > 6 for t in turns)))
@@ -0,0 +1,120 @@
+"""
+Writers for ranked guess lists (see matching.save_ranked_guesses).
+
+The ranking is worked out once - a vectorized sort of the score array, or a heap selection
+when only the best k rows are wanted - and the rows are then streamed, best first, to a
+writer chosen by the file extension:
+
+    .xlsx   openpyxl write-only workbook, rows go straight to the file
+    .csv    plain text
+    .npy    NumPy structured array, one field per column ('guess' as long as the words)
+
+The first few rows are echoed to the console from the same pass.
+"""
+import csv
+import heapq
+
+import numpy as np
+import openpyxl as opxl
+
+ECHO_ROWS = 10
+
+
+def ranked_order(scores, guesses, higher_better=False, k=None):
+    """
+    indices into guesses, best first, ordered by (score, guess) - descending when
+    higher_better, as sorted(zip(scores, guesses), reverse=higher_better).  With k only the
+    best k are selected, with a heap.
+    """
+    if k is not None and k < len(guesses):
+        select = heapq.nlargest if higher_better else heapq.nsmallest
+        return [j for s, g, j in select(k, zip(scores, guesses, range(len(guesses))))]
+
+    order = np.lexsort((np.array(guesses), np.asarray(scores)))
+    return (order[::-1] if higher_better else order).tolist()
+
+
+class XlsxWriter:
+    def __init__(self, filename, header, n_rows):
+        self.filename = filename
+        self.wb = opxl.Workbook(write_only=True)
+        self.ws = self.wb.create_sheet()
+        if header is not None:
+            self.ws.append(header)
+
+    def append(self, row):
+        self.ws.append(row)
+
+    def close(self):
+        self.wb.save(filename=self.filename)
+
+
+class CsvWriter:
+    def __init__(self, filename, header, n_rows):
+        self.f = open(filename, 'w', newline='')
+        self.writer = csv.writer(self.f)
+        if header is not None:
+            self.writer.writerow(header)
+
+    def append(self, row):
+        self.writer.writerow(row)
+
+    def close(self):
+        self.f.close()
+
+
+class NpyWriter:
+    """
+    fills a preallocated structured array; field names come from the header, or are
+    'score' and 'guess' without one.  The array is allocated at the first row, when the
+    length of the guesses is known.
+    """
+    def __init__(self, filename, header, n_rows):
+        self.filename = filename
+        self.header = header if header is not None else ['score', 'guess']
+        self.n_rows = n_rows
+        self.records = None
+        self.n = 0
+
+    def append(self, row):
+        if self.records is None:
+            guess = 'U%d' % len(row[1])
+            self.records = np.zeros(self.n_rows, dtype=[(name, guess if name == 'guess' else np.float64) for name in self.header])
+        self.records[self.n] = tuple(row)
+        self.n += 1
+
+    def close(self):
+        if self.records is None:
+            self.records = np.zeros(0, dtype=[(name, 'U5' if name == 'guess' else np.float64) for name in self.header])
+        np.save(self.filename, self.records[:self.n])
+
+
+WRITERS = {'.xlsx': XlsxWriter, '.csv': CsvWriter, '.npy': NpyWriter}
+
+
+def open_writer(filename, header, n_rows):
+    for ext, writer in WRITERS.items():
+        if filename.lower().endswith(ext):
+            return writer(filename, header, n_rows)
+    raise ValueError('Unknown export format for %s, expected one of %s' % (filename, ', '.join(WRITERS)))
+
+
+def export_ranked(guesses, columns, filename, higher_better=False, k=None, echo=ECHO_ROWS):
+    """
+    Write the guesses ranked by the first of columns (a dict of {name: list of scores}), best
+    first, one row per guess: first column's score, the guess, the other columns' scores.
+    A header row of the column names is written unless columns has the single name None.
+    With k only the best k rows are written.  The first echo rows are printed.
+    """
+    names = list(columns)
+    first, others = columns[names[0]], [columns[name] for name in names[1:]]
+    header = None if names == [None] else [names[0], 'guess'] + names[1:]
+
+    order = ranked_order(first, guesses, higher_better, k)
+    writer = open_writer(filename, header, len(order))
+    for n, j in enumerate(order):
+        row = [first[j], guesses[j]] + [scores[j] for scores in others]
+        if n < echo:
+            print(tuple(row))
+        writer.append(row)
+    writer.close()
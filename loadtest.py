@@ -0,0 +1,93 @@
+"""
+Load-test client for server.py.
+
+Sends -n /suggest requests, -c at a time, for games in progress against real wordles - the
+opener (-f) and, for half of them, a second guess - and reports requests per second and
+the latency percentiles:
+
+    python server.py -j 4 &
+    python loadtest.py -n 1000 -c 8
+"""
+import argparse
+import json
+import random
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from corpus import load_corpus
+from matching import ST_CORRECT, ST_ELSEWHERE, paint_guess
+from server import DEFAULT_PORT
+
+FEEDBACK_LETTERS = {ST_CORRECT: 'C', ST_ELSEWHERE: 'E'}
+
+
+def feedback(wordle, guess):
+    return ''.join(FEEDBACK_LETTERS.get(st, 'R') for st in paint_guess(wordle, guess))
+
+
+def make_requests(n, opener, seed=None):
+    rng = random.Random(seed)
+    wordles = load_corpus('real').words
+    guesses = load_corpus('combined').nrl_words()
+
+    requests = []
+    for k in range(n):
+        wordle = rng.choice(wordles)
+        history = [[opener, feedback(wordle, opener)]]
+        if rng.random() < 0.5:
+            guess = rng.choice(guesses)
+            history += [[guess, feedback(wordle, guess)]]
+        requests += [json.dumps({'history': history}).encode('utf-8')]
+    return requests
+
+
+def post(url, body):
+    """
+    (latency in seconds, ok) for one request
+    """
+    t0 = time.perf_counter()
+    req = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req) as reply:
+            ok = reply.status == 200
+            reply.read()
+    except OSError:
+        ok = False
+    return time.perf_counter() - t0, ok
+
+
+def run(url, requests, concurrency):
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(lambda body: post(url, body), requests))
+    return results, time.perf_counter() - t0
+
+
+def report(results, elapsed):
+    latency = 1000.0 * np.array([t for t, ok in results])
+    errors = sum(1 for t, ok in results if not ok)
+
+    print('Requests: %d in %.2f sec, %.1f requests/sec, %d error(s)' % (len(results), elapsed, len(results) / elapsed, errors))
+    print('Latency ms: p50 %.1f  p90 %.1f  p99 %.1f  max %.1f' %
+          tuple(np.percentile(latency, [50, 90, 99]).tolist() + [latency.max()]))
+
+
+def _psetup():
+    parser = argparse.ArgumentParser(description='Wordle Solver Service Load Test')
+    parser.add_argument('--url', type=str, default='http://127.0.0.1:%d/suggest' % DEFAULT_PORT, help='Service URL')
+    parser.add_argument('-n', type=int, default=500, help='Number of requests')
+    parser.add_argument('-c', type=int, default=8, help='Concurrent requests')
+    parser.add_argument('-f', type=str, default='LARES', help='First guess of every game')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for the games')
+
+    return parser
+
+
+if __name__ == "__main__":
+    args = _psetup().parse_args()
+
+    requests = make_requests(args.n, args.f.upper(), args.seed)
+    report(*run(args.url, requests, args.c))
@@ -4,9 +4,9 @@ ToDo: try to clean up outdated comments
 
 routines for wordle match logic.
 Terminology:
-    wordle : str, 5-letter
+    wordle : str, 5-letter (or any length from MIN_WORD_LEN to MAX_WORD_LEN)
         the truth
-    guess : str, 5-letter
+    guess : str, same length as the wordle
         the word to test for a match to the wordle
     state : list if int
     `   results of testing the guess against match.  each letter is
@@ -19,34 +19,100 @@ Terminology:
     filter : given a guess and a state, test whether a candidate wordle matches.  This
         is the inverse of paint.
 """
+import heapq
+import math
 import random
 import time
-import openpyxl as opxl
 
 import numpy as np
 
+from export import export_ranked
+
 ST_REJECT = 0
 ST_CORRECT = 1
 ST_ELSEWHERE = 2
 
-TICK_LINES = 10
+N_PATTERNS = 243 # 3**5 possible states, see pattern_matrix.py
+MIN_WORD_LEN = 4 # word lengths the matching core supports; patterns are 3**length codes,
+MAX_WORD_LEN = 8 # uint8 up to 5 letters and uint16 above (see pattern_dtype)
+
+TICK_LINES = 10 # progress printed every this many guesses (blocks); None prints nothing
+PARTITION_BLOCK = 1 << 22 # guess x word patterns gathered per block in partition_list_reduction
+HISTOGRAM_BLOCK = 1 << 22 # guess x pattern histogram cells per block in rank_guesses
+PAINT_BLOCK = 1 << 22 # guess x wordle pairs painted per chunk in paint_many
+COLLAPSE_MAX_COLUMNS = 64 # rank_guesses collapses equivalent guesses when this few words remain
+SIGNATURE_SEED = 2022 # fixed hash weights for collapse_guesses
+ANYTIME_BLOCK = 256 # guesses scored between yields of iter_top_guesses
+BNB_BLOCK = 256 # guesses evaluated together in branch_and_bound_search
+BNB_CHUNK = 128 # wordlist words scored between bound checks in branch_and_bound_search
+MC_START = 100 # wordles and list words sampled in the first round of monte_carlo_search
+MC_Z = 3.0 # confidence interval half-width, in standard errors, for dropping a losing guess
+
+PATTERN_WEIGHTS = np.array([1, 3, 9, 27, 81], dtype=np.uint8) # base-3 pattern code = sum(state * weight)
+
+# ranking objectives computed by rank_guesses, see histogram_objectives
+OBJECTIVES = ['expected', 'entropy', 'worst', 'buckets']
+# joint objectives over several boards (Dordle, Quordle), see rank_guesses_multi
+MULTI_OBJECTIVES = ['sum', 'product', 'entropy']
+OBJECTIVE_HIGHER_BETTER = {'expected': False, 'entropy': True, 'worst': False, 'buckets': True,
+                           'sum': False, 'product': False}
+
+def n_patterns(length):
+    """
+    number of feedback patterns for words of length letters
+    """
+    return 3 ** length
+
+def pattern_dtype(length):
+    """
+    smallest unsigned type that holds every pattern code for words of length letters
+    """
+    return np.uint8 if n_patterns(length) <= 256 else np.uint16
 
-def save_ranked_guesses(guesses, list_lens, filename):
+def pattern_weights(length):
     """
-    Sort the guesses list according to average lengths (lowest first) and
-    write them to an Excel file
+    base-3 weights of the letter positions, PATTERN_WEIGHTS for 5-letter words
     """
+    return (3 ** np.arange(length)).astype(pattern_dtype(length))
 
-    z_sort = sorted(zip(list_lens, guesses), reverse=False)
-    for zs in z_sort[:10]:
-        print(zs)
+def _histogram_size(*blocks):
+    """
+    histogram size for blocks of pattern codes: N_PATTERNS for uint8 codes (words of up to
+    5 letters), otherwise one more than the largest code present
+    """
+    if all(b.dtype == np.uint8 for b in blocks):
+        return N_PATTERNS
+    return max(int(b.max()) + 1 if b.size > 0 else 1 for b in blocks)
 
-    wb = opxl.Workbook()
-    ws = wb.active
-    for zs in z_sort:
-        ws.append(zs)
+def _word_length(words):
+    return len(words[0]) if len(words) > 0 else 5
 
-    wb.save(filename=filename)
+def _histogram_rows(length):
+    """
+    guesses per block so that their feedback histograms stay within HISTOGRAM_BLOCK cells
+    """
+    return max(1, HISTOGRAM_BLOCK // max(N_PATTERNS, n_patterns(length)))
+
+def save_ranked_guesses(guesses, list_lens, filename, objective='expected', k=None):
+    """
+    Rank the guesses list according to average lengths (lowest first) and
+    write them to an Excel file (or .csv / .npy, see export.py)
+
+    list_lens may also be a dict of {objective: scores} as returned by rank_guesses.  The
+    guesses are then ranked by objective (best first) and each row holds the objective's
+    score, the guess, then the other objectives' scores.
+
+    With k only the best k guesses are written.
+    """
+    if isinstance(list_lens, dict):
+        columns = {objective: list_lens[objective]}
+        columns.update((name, scores) for name, scores in list_lens.items() if name != objective)
+        higher_better = OBJECTIVE_HIGHER_BETTER[objective]
+    else:
+        columns = {None: list_lens}
+        higher_better = False
+
+    export_ranked(guesses, columns, filename, higher_better, k)
 
 def count_painted_letters1(guess, state, letter):
     """
@@ -63,7 +129,7 @@ def count_painted_letters(guess, state, letter):
     or ST_ELSEWHERE
     """
     paint_count = 0
-    for k in range(5):
+    for k in range(len(guess)):
         if state[k] == ST_REJECT:
             continue
         if guess[k] != letter:
@@ -75,7 +141,7 @@ def count_painted_letters(guess, state, letter):
 
 def paint_guess(wordle, guess):
     """
-    say you have a guess and a wordle, return a list of 5 states as follows:
+    say you have a guess and a wordle, return a list of states, one per letter, as follows:
     o	Mark all the positional hits (greens)
     o	Progress left to right and consider any guess letters that are in the
         wordle and not yet coded.  They get coded gold if they are in the Wordle
@@ -84,13 +150,14 @@ def paint_guess(wordle, guess):
 
     """
 
-    state = [ST_REJECT] * 5 # defaults
+    n = len(guess)
+    state = [ST_REJECT] * n # defaults
 
-    for k in range(5):
+    for k in range(n):
         if wordle[k] == guess[k]:
             state[k] = ST_CORRECT
 
-    for k in range(5):
+    for k in range(n):
         if state[k] != ST_REJECT: # already painted
             continue
 
@@ -107,16 +174,111 @@ def paint_guess(wordle, guess):
 
     return state
 
+def pack_words(words, length=None):
+    """
+    pack a list of equal-length words into an (N, L) uint8 array of letter codes
+    (ord(letter) - ord('A')), the form used by paint_many.  L is the length of the words,
+    or length (default 5) for an empty list.  Raises ValueError if the letters don't add up
+    to whole words of that length.
+    """
+    if len(words) == 0:
+        return np.zeros((0, length or 5), dtype=np.uint8)
+    if length is None:
+        length = len(words[0])
+    buf = ''.join(words).encode('ascii')
+    if len(buf) != length * len(words):
+        raise ValueError('Words must all have %d letters' % length)
+    return (np.frombuffer(buf, dtype=np.uint8).reshape(-1, length) - ord('A')).astype(np.uint8)
+
+def _paint_block(g, w):
+    """
+    paint_many for a single chunk: g is (n, L), w is (m, L), returns (n, m) pattern codes.
+
+    A guess letter that isn't green is gold while the wordle still has copies of it that
+    are neither green nor claimed by the same letter further left, so it is gold exactly
+    when fewer non-green copies precede it in the guess than the wordle has copies left
+    over after the greens.  Only guesses that repeat a letter need the corrections.
+    """
+    n, length = g.shape
+    m = w.shape[0]
+    green = g[:, None, :] == w[None, :, :]
+
+    # copies of every letter in each wordle, as (26, m) so a guess letter picks a row
+    copies = np.zeros((m, 26), dtype=np.uint8)
+    for j in range(length):
+        copies[np.arange(m), w[:, j]] += 1
+    copies = np.ascontiguousarray(copies.T)
+
+    dtype = pattern_dtype(length)
+    weights = pattern_weights(length)
+    codes = np.zeros((n, m), dtype=dtype)
+    for k in range(length):
+        # copies of this letter in the wordle that are not used up by a green
+        avail = copies[g[:, k]]
+        avail -= green[:, :, k]
+        for j in range(length):
+            rows = np.nonzero(g[:, j] == g[:, k])[0] if j != k else []
+            if len(rows) > 0:
+                avail[rows] -= green[rows, :, j]
+
+        gold = ~green[:, :, k] & (avail > 0)
+
+        # non-green copies further left in the guess claim the copies first
+        rows = np.nonzero((g[:, :k] == g[:, k:k + 1]).any(axis=1))[0]
+        if len(rows) > 0:
+            before = np.zeros((len(rows), m), dtype=np.uint8)
+            for i in range(k):
+                before += (g[rows, i] == g[rows, k])[:, None] & ~green[rows, :, i]
+            gold[rows] &= before < avail[rows]
+
+        codes += weights[k] * (ST_CORRECT * green[:, :, k] + ST_ELSEWHERE * gold).astype(dtype)
+
+    return codes
+
+def paint_many(guesses, wordles, chunk_rows=None, out=None):
+    """
+    Batch version of paint_guess.  guesses (N, L) and wordles (M, L) are packed uint8
+    arrays (see pack_words; lists of words are packed on the fly).  Returns an (N, M) array
+    of pattern_dtype(L) where entry [i, j] is the base-3 code of
+    paint_guess(wordles[j], guesses[i]):
+
+        code = sum(state[k] * 3**k)
+
+    Repeated letters are handled as in paint_guess - all greens first, then golds left to
+    right while the wordle still has unpainted copies of the letter.
+
+    chunk_rows (int, optional)
+        number of guesses painted per broadcast step; defaults to keeping each step near
+        PAINT_BLOCK pairs so memory stays bounded for large N x M
+    out (array like, optional)
+        destination (e.g. a writable memmap) instead of a new array
+    """
+    if not isinstance(guesses, np.ndarray):
+        guesses = pack_words(guesses)
+    if not isinstance(wordles, np.ndarray):
+        wordles = pack_words(wordles)
+
+    if out is None:
+        out = np.empty((guesses.shape[0], wordles.shape[0]), dtype=pattern_dtype(guesses.shape[1]))
+
+    if chunk_rows is None:
+        chunk_rows = max(1, PAINT_BLOCK // max(1, wordles.shape[0]))
+
+    for r0 in range(0, guesses.shape[0], chunk_rows):
+        out[r0:r0 + chunk_rows] = _paint_block(guesses[r0:r0 + chunk_rows], wordles)
+
+    return out
+
 def filter_guess_nrl(word, guess, state):
     """
     Given the guess and state feedback from wordle turn, decide if the
     candidate word is valid or not.
 
-    This version is only valid for words/guesses with 5 distinct letters
+    This version is only valid for words/guesses with distinct letters
     (non-repeating letters).
 
     """
-    for k in range(5):
+    for k in range(len(guess)):
         if state[k] == ST_CORRECT:
             if word[k] != guess[k]:
                 return False
@@ -164,7 +326,8 @@ def filter_guess(word, guess, state):
     R: Fail if nm < nw
 
     """
-    for k in range(5):
+    n = len(guess)
+    for k in range(n):
         if state[k] == ST_CORRECT:
             if word[k] != guess[k]:
                 return False
@@ -172,7 +335,7 @@ def filter_guess(word, guess, state):
             if word[k] == guess[k]:  # both E and R have to fail for exact match
                 return False
 
-    for k in range(5):
+    for k in range(n):
         if state[k] == ST_CORRECT:
             continue
 
@@ -192,19 +355,174 @@ def filter_guess(word, guess, state):
 
     return True
 
+class Constraint:
+    """
+    The information from one or more (guess, state) rows compiled into a form that can be
+    tested against a whole packed word array (see pack_words) at once, for words of length
+    letters:
+
+    allowed : (length, 256) bool
+        allowed[k, c] is False if letter code c can't be at position k - either a green
+        elsewhere pins the position, or the letter was played there and not painted green
+    min_count, max_count : (256,) int
+        bounds on the number of copies of each letter, from golds (at least the number
+        painted) and greys (no more than the number painted)
+    green : (length,) int
+        letter code painted green at each position, -1 if none
+
+    Applying the constraint for a single row accepts exactly the words filter_guess accepts;
+    adding more rows intersects them.
+    """
+    def __init__(self, length=5):
+        self.length = length
+        self.allowed = np.ones((length, 256), dtype=bool)
+        self.min_count = np.zeros(256, dtype=np.int8)
+        self.max_count = np.full(256, length, dtype=np.int8)
+        self.green = np.full(length, -1, dtype=np.int16)
+
+    def add(self, guess, state):
+        """
+        fold a further guess / state row into the constraint
+        """
+        codes = pack_words([''.join(guess)], self.length)[0]
+
+        for k in range(self.length):
+            c = codes[k]
+            if state[k] == ST_CORRECT:
+                self.green[k] = c
+                keep = self.allowed[k, c]
+                self.allowed[k] = False
+                self.allowed[k, c] = keep
+                continue
+
+            self.allowed[k, c] = False
+
+            n_painted = count_painted_letters(guess, state, guess[k])
+            if state[k] == ST_ELSEWHERE:
+                self.min_count[c] = max(self.min_count[c], n_painted)
+            else:  # ST_REJECT
+                self.max_count[c] = min(self.max_count[c], n_painted)
+
+        return self
+
+    def matches(self, packed):
+        """
+        boolean mask of the rows of packed (N, length) that satisfy every row of the constraint
+        """
+        mask = np.ones(packed.shape[0], dtype=bool)
+        for k in range(self.length):
+            mask &= self.allowed[k, packed[:, k]]
+
+        for c in np.nonzero((self.min_count > 0) | (self.max_count < self.length))[0]:
+            n = (packed == c).sum(axis=1)
+            mask &= (n >= self.min_count[c]) & (n <= self.max_count[c])
+
+        return mask
+
+    def filter(self, words, packed=None):
+        """
+        the words that satisfy the constraint.  Pass packed = pack_words(words) when the same
+        list is filtered repeatedly, to skip packing it again.
+        """
+        if packed is None:
+            packed = pack_words(words)
+        return [words[k] for k in np.nonzero(self.matches(packed))[0]]
+
+    def reduce(self, words, packed):
+        """
+        like filter, but also return the packed rows of the words kept, so the result can
+        be filtered again without repacking
+        """
+        keep = np.nonzero(self.matches(packed))[0]
+        return [words[k] for k in keep], packed[keep]
+
+class GuessIndex:
+    """
+    Bitset index of a packed word list (see pack_words) for hard mode, where every guess
+    must keep the greens in place and use each revealed letter at least as often as it was
+    painted:
+
+    at : (L, 26, bytes) uint8
+        packed bitset of the words with letter c at position k
+    at_least : (26, L + 1, bytes) uint8
+        packed bitset of the words with at least m copies of letter c
+
+    hard_mode() ANDs the few bitsets a Constraint needs instead of testing every word.
+    """
+    def __init__(self, packed):
+        packed = np.asarray(packed)
+        letters = np.arange(26, dtype=np.uint8)
+        self.n = packed.shape[0]
+        self.at = np.packbits(packed.T[:, None, :] == letters[None, :, None], axis=2)
+
+        counts = (packed[:, :, None] == letters).sum(axis=1)
+        self.at_least = np.packbits(counts.T[:, None, :] >= np.arange(packed.shape[1] + 1)[None, :, None], axis=2)
+
+    def hard_mode(self, constraint):
+        """
+        boolean mask of the words that are legal hard-mode guesses under constraint
+        """
+        bits = np.full(self.at.shape[2], 0xff, dtype=np.uint8)
+        for k in np.nonzero(constraint.green >= 0)[0]:
+            bits &= self.at[k, constraint.green[k]]
+        for c in np.nonzero(constraint.min_count > 0)[0]:
+            bits &= self.at_least[c, min(int(constraint.min_count[c]), self.at_least.shape[1] - 1)]
+        return np.unpackbits(bits, count=self.n).astype(bool)
+
+def compile_constraint(guess, state):
+    """
+    compile a single guess and its state into a Constraint
+    """
+    return Constraint(len(guess)).add(guess, state)
+
+FEEDBACK_CODES = {'R': ST_REJECT, 'C': ST_CORRECT, 'E': ST_ELSEWHERE}
+
+def parse_feedback(fb, length=5):
+    """
+    state for a feedback string of R (grey), E (gold) and C (green), as typed on the
+    SubsequentMove.py command line, for a word of length letters.  Raises ValueError for
+    anything else.
+    """
+    if len(fb) != length:
+        raise ValueError('Feedback string must be %d characters' % length)
+    for fbl in fb:
+        if fbl not in FEEDBACK_CODES:
+            raise ValueError('Illegal character <%s> in status word' % fbl)
+    return [FEEDBACK_CODES[fbl] for fbl in fb]
+
+def compile_history(rows):
+    """
+    compile a list of (guess, state) rows - e.g. the filled rows of the GUI grid - into a
+    single Constraint
+    """
+    constraint = Constraint(len(rows[0][0]) if len(rows) > 0 else 5)
+    for guess, state in rows:
+        constraint.add(guess, state)
+    return constraint
+
 def filter_word_list(words, guess, state):
     """
     filter the list to remove words that don't conform the the state associated with guess
 
     """
-    return [word for word in words if filter_guess(word, guess, state)]
+    return compile_constraint(guess, state).filter(words)
 
-def count_remaining_words(wordle, guess, wordlist, nrl_only):
+def count_remaining_words(wordle, guess, wordlist, nrl_only, pmatrix=None):
     """
     Given a (what would be hidden) wordle, calculate how many words remain in the
     word list if guess is played.
 
+    pmatrix (PatternMatrix, optional)
+        precomputed feedback matrix (see pattern_matrix.py).  When given, the count is
+        read from the matrix instead of painting and filtering every word.  The matrix
+        always gives the exact filter_guess count: nrl_only is ignored, so for words with
+        repeated letters the result can differ from the filter_guess_nrl one.
     """
+    if pmatrix is not None:
+        row = pmatrix.row(guess)
+        pats = row[pmatrix.answer_indices(wordlist)]
+        return int(np.count_nonzero(pats == row[pmatrix.answer_index[wordle]]))
+
     st = paint_guess(wordle, guess)
 
     filter_function = filter_guess_nrl if nrl_only else filter_guess
@@ -216,11 +534,31 @@ def count_remaining_words(wordle, guess, wordlist, nrl_only):
 
     return sum
 
-def reducing_power(wordles, guess, wordlist, nrl_only):
+def _reducing_power_matrix(row, wordle_ndx, list_ndx):
+    """
+    matrix version of reducing_power: row holds the pattern codes of the guess against
+    every answer, wordle_ndx and list_ndx are the answer columns of wordles and wordlist.
+    """
+    wordle_pats = row[wordle_ndx]
+    list_pats = row[list_ndx]
+    sum = 0
+    for p in wordle_pats:
+        sum += int(np.count_nonzero(list_pats == p))
+    return sum / float(len(wordle_ndx))
+
+def reducing_power(wordles, guess, wordlist, nrl_only, pmatrix=None):
     """
     nrl_only (bool)
         True if guess and wordlist are NRL (non-repeated leters) words
+    pmatrix (PatternMatrix, optional)
+        read feedback patterns from the precomputed matrix instead of painting; this is
+        always exact filter_guess semantics and nrl_only is ignored (see
+        count_remaining_words)
     """
+    if pmatrix is not None:
+        return _reducing_power_matrix(pmatrix.row(guess), pmatrix.answer_indices(wordles),
+                                      pmatrix.answer_indices(wordlist))
+
     sum = 0
     for wordle in wordles:
         n = count_remaining_words(wordle, guess, wordlist, nrl_only)
@@ -230,19 +568,598 @@ def reducing_power(wordles, guess, wordlist, nrl_only):
     avg = sum / float(len(wordles))
     return avg
 
-def measure_list_reduction(wordles, guesses, wordlist, nrl_only, tick_lines=TICK_LINES):
+def measure_list_reduction(wordles, guesses, wordlist, nrl_only, tick_lines=TICK_LINES, pmatrix=None):
+    """
+    reducing_power for each guess: the average remaining list length.  As there, pmatrix
+    means exact filter_guess semantics and nrl_only is then ignored.
+    """
+    if pmatrix is not None:
+        wordle_ndx = pmatrix.answer_indices(wordles)
+        list_ndx = pmatrix.answer_indices(wordlist)
 
     avg_list_len = []
     for k, guess in enumerate(guesses):
-        avg = reducing_power(wordles, guess, wordlist, nrl_only)
+        if pmatrix is not None:
+            avg = _reducing_power_matrix(pmatrix.row(guess), wordle_ndx, list_ndx)
+        else:
+            avg = reducing_power(wordles, guess, wordlist, nrl_only)
         avg_list_len += [avg]
 
-        if k % tick_lines == 0:
+        if tick_lines is not None and k % tick_lines == 0:
             print('%5.5d' % k, end='\r')
 
-    print('%5.5d' % len(guesses))
+    if tick_lines is not None:
+        print('%5.5d' % len(guesses))
     return avg_list_len
 
+def partition_counts(guess, wordlist, pmatrix=None):
+    """
+    Group the words in wordlist into buckets by the feedback they give to guess and
+    return the bucket sizes as a dict of {state tuple: count}, or as an array of
+    N_PATTERNS counts indexed by pattern code when pmatrix is given.
+
+    Every word in a bucket leaves exactly the words of that bucket after filtering, so
+    the remaining list size for any wordle is the size of its bucket.
+    """
+    if pmatrix is not None:
+        pats = pmatrix.row(guess)[pmatrix.answer_indices(wordlist)]
+        return np.bincount(pats, minlength=_histogram_size(pats))
+
+    counts = {}
+    for word in wordlist:
+        st = tuple(paint_guess(word, guess))
+        counts[st] = counts.get(st, 0) + 1
+    return counts
+
+def partition_reducing_power(wordles, guess, wordlist, pmatrix=None):
+    """
+    Same result as reducing_power, computed from the partition of wordlist by guess
+    feedback: O(len(wordles) + len(wordlist)) per guess rather than their product.
+    When wordles is wordlist this is the sum of squared bucket sizes over the count.
+    """
+    counts = partition_counts(guess, wordlist, pmatrix)
+
+    if pmatrix is not None:
+        wordle_pats = pmatrix.row(guess)[pmatrix.answer_indices(wordles)]
+        return int(counts[wordle_pats].sum()) / float(len(wordles))
+
+    sum = 0
+    for wordle in wordles:
+        sum += counts.get(tuple(paint_guess(wordle, guess)), 0)
+    return sum / float(len(wordles))
+
+def partition_sums(rows, list_cols, wordle_cols):
+    """
+    rows is an (n, m) block of pattern codes, one row per guess.  Bucket the list_cols
+    columns of each row and return, per row, the total bucket size over the wordle_cols
+    columns - i.e. the sum over wordles of the remaining list length.
+    """
+    if len(list_cols) * len(wordle_cols) <= N_PATTERNS:
+        # small positions: counting equal (wordle, word) pairs is cheaper than clearing a
+        # histogram per row
+        return (rows[:, wordle_cols][:, :, None] == rows[:, list_cols][:, None, :]).sum(axis=(1, 2))
+
+    n = rows.shape[0]
+    list_rows, wordle_rows = rows[:, list_cols], rows[:, wordle_cols]
+    size = _histogram_size(list_rows, wordle_rows)
+    offsets = (np.arange(n) * size)[:, None]
+
+    counts = np.bincount((list_rows + offsets).ravel(), minlength=n * size)
+    return counts[(wordle_rows + offsets)].sum(axis=1)
+
+def partition_list_reduction(wordles, guesses, wordlist, tick_lines=TICK_LINES, pmatrix=None):
+    """
+    Drop-in replacement for measure_list_reduction: the average remaining list length
+    for each guess, using partition_reducing_power.  With pmatrix, blocks of guesses are
+    bucketed at once with a single bincount.
+    """
+    if pmatrix is None:
+        avg_list_len = []
+        for k, guess in enumerate(guesses):
+            avg_list_len += [partition_reducing_power(wordles, guess, wordlist)]
+            if tick_lines is not None and k % tick_lines == 0:
+                print('%5.5d' % k, end='\r')
+        if tick_lines is not None:
+            print('%5.5d' % len(guesses))
+        return avg_list_len
+
+    guess_ndx = pmatrix.guess_indices(guesses)
+    wordle_ndx = pmatrix.answer_indices(wordles)
+    list_ndx = pmatrix.answer_indices(wordlist)
+
+    block = max(1, PARTITION_BLOCK // max(1, len(wordlist)))
+    avg_list_len = []
+    for b0 in range(0, len(guesses), block):
+        rows = np.asarray(pmatrix.matrix[guess_ndx[b0:b0 + block]])
+        sums = partition_sums(rows, list_ndx, wordle_ndx)
+
+        avg_list_len += [int(s) / float(len(wordles)) for s in sums]
+        if tick_lines is not None:
+            print('%5.5d' % (b0 + rows.shape[0]), end='\r')
+
+    if tick_lines is not None:
+        print('%5.5d' % len(guesses))
+    return avg_list_len
+
+def partition_histograms(rows, list_cols, wordle_cols):
+    """
+    rows is an (n, m) block of pattern codes, one row per guess.  Return two (n, P) arrays:
+    the bucket sizes of the list_cols columns, and of the wordle_cols columns.  P is
+    N_PATTERNS for 5-letter words (see _histogram_size).
+    """
+    n = rows.shape[0]
+    list_rows, wordle_rows = rows[:, list_cols], rows[:, wordle_cols]
+    size = _histogram_size(list_rows, wordle_rows)
+    offsets = (np.arange(n) * size)[:, None]
+
+    list_counts = np.bincount((list_rows + offsets).ravel(), minlength=n * size)
+    wordle_counts = np.bincount((wordle_rows + offsets).ravel(), minlength=n * size)
+    return list_counts.reshape(n, size), wordle_counts.reshape(n, size)
+
+def histogram_objectives(list_counts, wordle_counts):
+    """
+    All the ranking objectives for a block of guesses, from their feedback histograms
+    (see partition_histograms).  Returns a dict of arrays, one value per guess:
+
+    expected : average remaining list length over the wordles (as measure_list_reduction)
+    entropy : Shannon entropy (bits) of the feedback the hidden wordle gives
+    worst : largest remaining list a wordle can leave
+    buckets : number of different feedback patterns the wordles give
+    """
+    n_wordles = float(wordle_counts[0].sum())
+
+    p = wordle_counts / n_wordles
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plogp = np.where(wordle_counts > 0, p * np.log2(p), 0.0)
+
+    return {
+        'expected': (list_counts * wordle_counts).sum(axis=1) / n_wordles,
+        'entropy': -plogp.sum(axis=1),
+        'worst': np.where(wordle_counts > 0, list_counts, 0).max(axis=1),
+        'buckets': np.count_nonzero(wordle_counts, axis=1),
+    }
+
+def union_columns(wordlist, wordles):
+    """
+    The words a guess has to be painted against to score it: the wordlist, then any wordles
+    not in it.  Returns (columns, list_cols, wordle_cols), the last two index into columns.
+    """
+    columns = list(wordlist)
+    col = {w: k for k, w in enumerate(columns)}
+    for w in wordles:
+        if w not in col:
+            col[w] = len(columns)
+            columns += [w]
+    return columns, np.arange(len(wordlist)), np.array([col[w] for w in wordles], dtype=np.intp)
+
+def partition_signatures(rows):
+    """
+    Canonical form of the partition each row of an (n, m) pattern block makes of its m
+    words: every code is replaced by the first column it appears in.  Two guesses have
+    equal signatures exactly when they split the words into the same groups, whatever the
+    colours, and so score the same on every objective.
+    """
+    n, m = rows.shape
+    order = np.argsort(rows, axis=1, kind='stable')
+    ordered = np.take_along_axis(rows, order, axis=1)
+
+    starts = np.ones((n, m), dtype=bool)
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    group_start = np.maximum.accumulate(np.where(starts, np.arange(m), 0), axis=1)
+
+    signatures = np.empty((n, m), dtype=np.int32)
+    np.put_along_axis(signatures, order, np.take_along_axis(order, group_start, axis=1), axis=1)
+    return signatures
+
+def collapse_guesses(rows):
+    """
+    Group the rows of a pattern block by partition_signatures.  Returns (representatives,
+    classes): the row index of the first member of each class, and the class of every row,
+    so per-class results r expand to per-guess results as r[classes].
+
+    Signatures are grouped by a 64-bit hash; every member is then checked against its
+    representative and the exact (slower) row comparison is used if a hash ever collides.
+    """
+    signatures = partition_signatures(rows)
+    weights = np.random.RandomState(SIGNATURE_SEED).randint(1, 1 << 62, size=signatures.shape[1])
+    hashes = (signatures.astype(np.uint64) * weights.astype(np.uint64)).sum(axis=1)
+
+    _, representatives, classes = np.unique(hashes, return_index=True, return_inverse=True)
+    classes = classes.ravel()
+    if not np.array_equal(signatures, signatures[representatives[classes]]):
+        _, representatives, classes = np.unique(signatures, axis=0, return_index=True, return_inverse=True)
+        classes = classes.ravel()
+    return representatives, classes
+
+def rank_guesses(wordles, guesses, wordlist, tick_lines=TICK_LINES, pmatrix=None, collapse=None):
+    """
+    Score every guess on all OBJECTIVES in a single pass: each guess's feedback histogram is
+    built once and every objective is read from it.  Returns a dict of {objective: list of
+    scores}; the 'expected' scores are those of measure_list_reduction.
+
+    Patterns come from pmatrix when given, otherwise they are painted with paint_many.
+    Progress is printed every tick_lines blocks; tick_lines=None prints nothing.
+
+    With collapse, guesses that split the words identically (collapse_guesses) are scored
+    once per class and every member gets its class's scores.  By default this is done when
+    at most COLLAPSE_MAX_COLUMNS words are left, late in a game when most guesses fall into
+    a few classes.
+    """
+    columns, list_cols, wordle_cols = union_columns(wordlist, wordles)
+    if collapse is None:
+        collapse = len(columns) <= COLLAPSE_MAX_COLUMNS
+
+    if pmatrix is not None:
+        guess_rows = pmatrix.guess_indices(guesses)
+        word_cols = pmatrix.answer_indices(columns)
+    else:
+        packed_guesses = pack_words(guesses)
+        packed_columns = pack_words(columns)
+
+    if collapse:
+        if pmatrix is not None:
+            rows = pmatrix.matrix[guess_rows[:, None], word_cols[None, :]]
+        else:
+            rows = paint_many(packed_guesses, packed_columns)
+        representatives, classes = collapse_guesses(rows)
+        rows = rows[representatives]
+        if rows.dtype != np.uint8:
+            # long words have 3**L codes for these few words; their signatures group the
+            # words the same way with at most COLLAPSE_MAX_COLUMNS codes
+            rows = partition_signatures(rows)
+        block = _histogram_rows(_word_length(columns))
+        objectives = {name: [] for name in OBJECTIVES}
+        for b0 in range(0, len(representatives), block):
+            scores = histogram_objectives(*partition_histograms(rows[b0:b0 + block], list_cols, wordle_cols))
+            for name in OBJECTIVES:
+                objectives[name] += [scores[name]]
+        if tick_lines is not None:
+            print('%5.5d guesses in %d classes' % (len(guesses), len(representatives)))
+        return {name: np.concatenate(objectives[name])[classes].tolist() for name in OBJECTIVES}
+
+    block = max(1, min(PARTITION_BLOCK // max(1, len(columns)), _histogram_rows(_word_length(columns))))
+    scores = {name: [] for name in OBJECTIVES}
+    for b0 in range(0, len(guesses), block):
+        if pmatrix is not None:
+            rows = pmatrix.matrix[guess_rows[b0:b0 + block, None], word_cols[None, :]]
+        else:
+            rows = paint_many(packed_guesses[b0:b0 + block], packed_columns)
+
+        objectives = histogram_objectives(*partition_histograms(rows, list_cols, wordle_cols))
+        for name in OBJECTIVES:
+            scores[name] += objectives[name].tolist()
+
+        if tick_lines is not None and (b0 // block) % tick_lines == 0:
+            print('%5.5d' % (b0 + rows.shape[0]), end='\r')
+
+    if tick_lines is not None:
+        print('%5.5d' % len(guesses))
+    return scores
+
+def rank_guesses_multi(boards, guesses, tick_lines=TICK_LINES, pmatrix=None):
+    """
+    Score every guess on several boards at once (Dordle, Quordle).  boards is a list of
+    (wordles, wordlist), one per unsolved board, each as for rank_guesses.  A guess is
+    painted (or read from pmatrix) once against the union of the boards' words and the
+    same patterns are bucketed for every board.  Returns a dict of {objective: list of
+    scores} for MULTI_OBJECTIVES:
+
+    sum : total over the boards of the average remaining list length
+    product : product over the boards of the average remaining list length
+    entropy : joint entropy (bits) of the feedback on all the boards; the hidden wordles
+        are independent, so this is the sum of the boards' entropies
+    """
+    col = {}
+    for wordles, wordlist in boards:
+        for w in list(wordlist) + list(wordles):
+            col.setdefault(w, len(col))
+    columns = list(col)
+    board_cols = [(np.array([col[w] for w in wordlist], dtype=np.intp), np.array([col[w] for w in wordles], dtype=np.intp))
+                  for wordles, wordlist in boards]
+
+    if pmatrix is not None:
+        guess_rows = pmatrix.guess_indices(guesses)
+        word_cols = pmatrix.answer_indices(columns)
+    else:
+        packed_guesses = pack_words(guesses)
+        packed_columns = pack_words(columns)
+
+    block = max(1, min(PARTITION_BLOCK // max(1, len(columns)), _histogram_rows(_word_length(columns))))
+    scores = {name: [] for name in MULTI_OBJECTIVES}
+    for b0 in range(0, len(guesses), block):
+        if pmatrix is not None:
+            rows = pmatrix.matrix[guess_rows[b0:b0 + block, None], word_cols[None, :]]
+        else:
+            rows = paint_many(packed_guesses[b0:b0 + block], packed_columns)
+
+        total = np.zeros(rows.shape[0])
+        product = np.ones(rows.shape[0])
+        entropy = np.zeros(rows.shape[0])
+        for list_cols, wordle_cols in board_cols:
+            objectives = histogram_objectives(*partition_histograms(rows, list_cols, wordle_cols))
+            total += objectives['expected']
+            product *= objectives['expected']
+            entropy += objectives['entropy']
+
+        scores['sum'] += total.tolist()
+        scores['product'] += product.tolist()
+        scores['entropy'] += entropy.tolist()
+
+        if tick_lines is not None and (b0 // block) % tick_lines == 0:
+            print('%5.5d' % (b0 + rows.shape[0]), end='\r')
+
+    if tick_lines is not None:
+        print('%5.5d' % len(guesses))
+    return scores
+
+def best_guess_index(scores, objective):
+    """
+    index of the best guess by objective in a rank_guesses result
+    """
+    values = scores[objective]
+    if OBJECTIVE_HIGHER_BETTER[objective]:
+        return values.index(max(values))
+    return values.index(min(values))
+
+def letter_score_order(guesses, wordles):
+    """
+    guesses reordered by the stats.py letter-frequency score over wordles, highest first -
+    a cheap guess at which guesses will split the wordles best
+    """
+    from stats import alpha_frequency, remove_duplicate_letters, score_word
+
+    adist = alpha_frequency(remove_duplicate_letters(wordles))
+    scores = [score_word(ew, adist) for ew in remove_duplicate_letters(guesses)]
+    return sorted(range(len(guesses)), key=lambda k: -scores[k])
+
+def iter_top_guesses(wordles, guesses, wordlist, k=10, objective='expected', pmatrix=None,
+                     time_budget=None, block_rows=ANYTIME_BLOCK):
+    """
+    Anytime version of rank_guesses for one objective.  Guesses are scored block_rows at a
+    time in letter_score_order (the stats.score_words order over the wordles), so the first
+    blocks already hold most of the good guesses, and after every block this yields
+
+        (top, n_scored)
+
+    where top is the current best k as a list of (score, guess), best first, and n_scored
+    the number of guesses scored so far.  Ties go to the guess earlier in guesses, so the
+    last top is the head of the full ranking.
+
+    With time_budget (seconds) the search stops after the first block that ends past the
+    budget; the last value yielded is then the best found in the time.
+    """
+    t0 = time.time()
+    columns, list_cols, wordle_cols = union_columns(wordlist, wordles)
+    if pmatrix is not None:
+        guess_rows = pmatrix.guess_indices(guesses)
+        word_cols = pmatrix.answer_indices(columns)
+    else:
+        packed_guesses = pack_words(guesses)
+        packed_columns = pack_words(columns)
+
+    sign = -1.0 if OBJECTIVE_HIGHER_BETTER[objective] else 1.0
+    order = np.array(letter_score_order(guesses, wordles), dtype=np.intp)
+    top_index = np.zeros(0, dtype=np.intp)
+    top_key = np.zeros(0)  # sign * score, lower is better
+    for b0 in range(0, len(order), block_rows):
+        block = order[b0:b0 + block_rows]
+        if pmatrix is not None:
+            rows = pmatrix.matrix[guess_rows[block, None], word_cols[None, :]]
+        else:
+            rows = paint_many(packed_guesses[block], packed_columns)
+        scores = histogram_objectives(*partition_histograms(rows, list_cols, wordle_cols))[objective]
+
+        top_index = np.concatenate([top_index, block])
+        top_key = np.concatenate([top_key, sign * scores])
+        keep = np.lexsort((top_index, top_key))[:k]
+        top_index, top_key = top_index[keep], top_key[keep]
+
+        yield [(sign * key, guesses[g]) for key, g in zip(top_key.tolist(), top_index.tolist())], b0 + len(block)
+
+        if time_budget is not None and time.time() - t0 > time_budget:
+            return
+
+def top_guesses_within(wordles, guesses, wordlist, time_budget, k=10, objective='expected', pmatrix=None):
+    """
+    the last (top, n_scored) of iter_top_guesses with time_budget - the best k guesses found
+    in about time_budget seconds
+    """
+    result = [], 0
+    for result in iter_top_guesses(wordles, guesses, wordlist, k, objective, pmatrix, time_budget):
+        pass
+    return result
+
+def branch_and_bound_search(wordles, guesses, wordlist, k=1, pmatrix=None,
+                            block_rows=BNB_BLOCK, chunk=BNB_CHUNK, tick_lines=TICK_LINES):
+    """
+    The k guesses with the lowest average remaining list length - the same words and scores
+    as the k smallest of partition_list_reduction (ties to the earlier guess) - without
+    finishing the evaluation of guesses that can't make the top k.
+
+    A guess's total remaining length is sum(wordle_counts * list_counts) over its feedback
+    buckets (see partition_histograms).  The words are fed in a chunk at a time - wordles
+    that are also in the wordlist first, then other wordles, then the rest of the wordlist -
+    and both histograms only grow, so the product of the partial histograms can only grow
+    too.  A wordle in the wordlist that hasn't been fed in yet will also land in the same
+    bucket as itself, so
+
+        sum(partial wordle_counts * partial list_counts) + (such wordles still to come)
+
+    is a lower bound on the final total; once it exceeds the k-th best total found so far
+    the guess is abandoned.  Guesses are tried in letter_score_order, block_rows at a time,
+    so good totals are found early and the bound bites sooner.
+
+    Returns (ranked, work) where ranked is a list of (average, guess), best first, and work
+    is the fraction of the guess x word patterns that were actually computed.
+    """
+    in_list = set(wordlist)
+    mult = {}
+    for w in wordles:
+        mult[w] = mult.get(w, 0) + 1
+
+    words = sorted(mult, key=lambda w: w not in in_list) + [w for w in wordlist if w not in mult]
+    word_mult = np.array([mult.get(w, 0) for w in words], dtype=np.int64)
+    word_in_list = np.array([w in in_list for w in words], dtype=np.int64)
+    # lower bound still to come after the first j words
+    lb_after = np.append(np.cumsum((word_mult * word_in_list)[::-1])[::-1], 0)
+
+    if pmatrix is not None:
+        guess_rows = pmatrix.guess_indices(guesses)
+        cols = pmatrix.answer_indices(words)
+
+        def patterns(g, c0, c1):
+            return pmatrix.matrix[guess_rows[g][:, None], cols[None, c0:c1]]
+    else:
+        packed_guesses = pack_words(guesses)
+        packed_words = pack_words(words)
+
+        def patterns(g, c0, c1):
+            return paint_many(packed_guesses[g], packed_words[c0:c1])
+
+    order = np.array(letter_score_order(guesses, wordles), dtype=np.intp)
+    size = max(N_PATTERNS, n_patterns(_word_length(words)))  # histogram size, fixed over the chunks
+    best = []  # heap of (-total, -index) for the k best so far
+    computed = 0
+    for b0 in range(0, len(order), block_rows):
+        block = order[b0:b0 + block_rows]
+        bound = -best[0][0] if len(best) == k else None
+
+        wordle_counts = np.zeros((len(block), size), dtype=np.int64)
+        list_counts = np.zeros((len(block), size), dtype=np.int64)
+        alive = np.arange(len(block))
+        for c0 in range(0, len(words), chunk):
+            c1 = min(c0 + chunk, len(words))
+            pats = patterns(block[alive], c0, c1)
+            computed += pats.size
+
+            n = len(alive)
+            codes = (pats + (np.arange(n) * size)[:, None]).ravel()
+            wordle_counts[alive] += np.bincount(codes, np.tile(word_mult[c0:c1], n), n * size).reshape(n, size).astype(np.int64)
+            list_counts[alive] += np.bincount(codes, np.tile(word_in_list[c0:c1], n), n * size).reshape(n, size).astype(np.int64)
+
+            if bound is not None:
+                partial = (wordle_counts[alive] * list_counts[alive]).sum(axis=1)
+                alive = alive[partial + lb_after[c1] <= bound]
+                if len(alive) == 0:
+                    break
+
+        totals = (wordle_counts[alive] * list_counts[alive]).sum(axis=1)
+        for j, total in zip(alive, totals):
+            item = (-int(total), -int(block[j]))
+            if len(best) < k:
+                heapq.heappush(best, item)
+            elif item > best[0]:
+                heapq.heapreplace(best, item)
+
+        if tick_lines is not None and (b0 // block_rows) % tick_lines == 0:
+            print('%5.5d' % (b0 + len(block)), end='\r')
+
+    if tick_lines is not None:
+        print('%5.5d' % len(guesses))
+    ranked = sorted((-t, -g) for t, g in best)
+    work = computed / float(max(1, len(guesses) * len(words)))
+    return [(total / float(len(wordles)), guesses[g]) for total, g in ranked], work
+
+def _p_winner(estimate, se, leader):
+    """
+    probability that guess leader has the lowest true value when each estimate is normal
+    with standard error se and independent: the leader's value is integrated over with
+    Gauss-Hermite quadrature, the others must all come out above it
+    """
+    others = np.setdiff1d(np.arange(len(estimate)), [leader])
+    nodes, weights = np.polynomial.hermite_e.hermegauss(32)
+    erfc = np.frompyfunc(math.erfc, 1, 1)
+
+    p = 0.0
+    for t, w in zip(nodes, weights):
+        x = estimate[leader] + se[leader] * t
+        with np.errstate(divide='ignore', invalid='ignore'):
+            margin = np.where(se[others] > 0, (estimate[others] - x) / se[others],
+                              np.where(estimate[others] > x, np.inf, -np.inf))
+        above = (0.5 * erfc(-margin / math.sqrt(2.0))).astype(float)  # P(other > x)
+        p += w * np.exp(np.sum(np.log(np.maximum(above, 1e-300))))
+    return float(p / math.sqrt(2.0 * math.pi))
+
+def monte_carlo_search(wordles, guesses, wordlist, pmatrix=None, start=MC_START, z=MC_Z, seed=None):
+    """
+    Approximate best guess by average remaining list length, from samples of the wordles
+    and of the wordlist, with successive halving.
+
+    In each round the surviving guesses are scored on the first n wordles and n list words
+    of a random shuffle of each (n doubles every round, up to the full lists).  The estimate
+    of a guess's average is the fraction of sampled (wordle, word) pairs that get the same
+    feedback, times len(wordlist); its variance is the two-sample U-statistic one -
+    the spread over the sampled wordles plus the spread over the sampled words, each with a
+    finite population correction - all read from the same two feedback histograms.
+
+    After each round a guess is dropped if its interval (estimate +- z standard errors) lies
+    entirely above the leader's, then only the better half is kept.  The search ends when
+    one guess is left or the samples are the whole lists, where the estimates are exact.
+
+    Returns (ranked, p_winner, work): the last round's survivors as (estimate, standard
+    error, guess), best first; the probability, from the normal approximation, that the
+    first is the exact winner among all guesses; and the fraction of the guess x word
+    patterns of a full rank_guesses that were computed.
+    """
+    rng = np.random.RandomState(seed)
+    wordle_order = rng.permutation(len(wordles))
+    list_order = rng.permutation(len(wordlist))
+    n_wordles, n_list = len(wordles), len(wordlist)
+
+    if pmatrix is not None:
+        guess_rows = pmatrix.guess_indices(guesses)
+        wordle_cols = pmatrix.answer_indices(wordles)[wordle_order]
+        list_cols = pmatrix.answer_indices(wordlist)[list_order]
+    else:
+        packed_guesses = pack_words(guesses)
+        packed_wordles = pack_words(wordles)[wordle_order]
+        packed_list = pack_words(wordlist)[list_order]
+
+    block = _histogram_rows(_word_length(guesses))
+    estimate = np.zeros(len(guesses))
+    variance = np.zeros(len(guesses))
+    alive = np.arange(len(guesses))
+    computed = 0
+    n = start
+    while True:
+        nw, nl = min(n, n_wordles), min(n, n_list)
+        for b0 in range(0, len(alive), block):
+            g = alive[b0:b0 + block]
+            if pmatrix is not None:
+                cols = np.concatenate([list_cols[:nl], wordle_cols[:nw]])
+                rows = pmatrix.matrix[guess_rows[g, None], cols[None, :]]
+            else:
+                rows = paint_many(packed_guesses[g], np.concatenate([packed_list[:nl], packed_wordles[:nw]]))
+            computed += rows.size
+            list_counts, wordle_counts = partition_histograms(rows, np.arange(nl), np.arange(nl, nl + nw))
+
+            pairs = (wordle_counts * list_counts).sum(axis=1) / float(nw * nl)
+            wordle_spread = (wordle_counts * list_counts ** 2).sum(axis=1) / float(nw * nl * nl) - pairs ** 2
+            list_spread = (list_counts * wordle_counts ** 2).sum(axis=1) / float(nl * nw * nw) - pairs ** 2
+            estimate[g] = n_list * pairs
+            variance[g] = n_list ** 2 * (wordle_spread / nw * (1.0 - nw / float(n_wordles)) +
+                                         list_spread / nl * (1.0 - nl / float(n_list)))
+
+        order = alive[np.lexsort((alive, estimate[alive]))]
+        print('%5.5d guesses on %d wordles x %d words, leader %s %.2f' %
+              (len(alive), nw, nl, guesses[order[0]], estimate[order[0]]))
+
+        if len(alive) == 1 or (nw == n_wordles and nl == n_list):
+            break
+
+        se = np.sqrt(np.maximum(variance[order], 0.0))
+        leader_top = estimate[order[0]] + z * se[0]
+        order = order[estimate[order] - z * se <= leader_top]
+        alive = np.sort(order[:max(1, (len(order) + 1) // 2)])
+        n *= 2
+
+    se = np.sqrt(np.maximum(variance, 0.0))
+    p_winner = _p_winner(estimate, se, order[0])
+
+    ranked = [(float(estimate[g]), float(se[g]), guesses[g]) for g in order.tolist()]
+    work = computed / float(len(guesses) * len(union_columns(wordlist, wordles)[0]))
+    return ranked, p_winner, work
+
 def remove_non_nrl(wordlist):
     nrl_wordlist = []
     for word in wordlist:
@@ -272,6 +1189,10 @@ if __name__ == "__main__":
         print('guess=', guess, 'state=', [ST[s] for s in state], 'word=', word, res_str)
         if res ^ expected:
             raise ValueError('Unexpected result')
+        if compile_constraint(guess, state).matches(pack_words([word]))[0] != res \
+                or filter_word_list([word], guess, state) != ([word] if res else []) \
+                or compile_history([(guess, state)]).matches(pack_words([word]))[0] != res:
+            raise ValueError('Constraint disagrees with filter_guess')
 
 
     test_paint('ABCDE', 'FGHIJ')
@@ -319,12 +1240,86 @@ if __name__ == "__main__":
     test_filter('AAxxx', [C, E, R, R, R], 'AAyyy', F) # should Fail
     test_filter('AAxxx', [C, E, R, R, R], 'AyAAy', P) # should Pass
     test_filter('AAxxx', [C, E, R, R, R], 'Ayyyy', F) # should Fail
+    print('...')
 
-    combined_wordlist = [line.strip().upper() for line in open("combined_wordlist.txt")]
-    combined_wordlist = sorted(combined_wordlist[1:])  #get rid of first line comment
-    common_words = [line.strip().upper() for line in open("common_words.txt")]
-    common_words = list(set(common_words)) # removed duplicates
-    common_words = [w for w in common_words if w in combined_wordlist] # delete illegal words
+    def test_paint_many(words):
+        codes = paint_many(words, words, chunk_rows=3)
+        for i, guess in enumerate(words):
+            for j, wordle in enumerate(words):
+                st = paint_guess(wordle, guess)
+                if codes[i, j] != sum(s * int(w) for s, w in zip(st, PATTERN_WEIGHTS)):
+                    raise ValueError('paint_many mismatch: wordle=%s guess=%s' % (wordle, guess))
+        print('paint_many matches paint_guess for', len(words), 'x', len(words))
+
+    test_paint_many(['ABCDE', 'FGHIJ', 'AAXXX', 'AYAYY', 'AYAAY', 'XXXXA', 'YYYAA', 'CCCXX', 'YBBYY', 'XBBXX',
+                     'EERIE', 'EMCEE', 'ABBEY', 'SPEED', 'ERASE'])
+
+    def test_constraint(words):
+        packed = pack_words(words)
+        for guess in words:
+            for wordle in words:
+                st = paint_guess(wordle, guess)
+                expected = [filter_guess(word, guess, st) for word in words]
+                if list(compile_constraint(guess, st).matches(packed)) != expected:
+                    raise ValueError('Constraint mismatch: guess=%s state=%s' % (guess, [ST[s] for s in st]))
+                if filter_word_list(words, guess, st) != [w for w, ok in zip(words, expected) if ok]:
+                    raise ValueError('filter_word_list mismatch: guess=%s state=%s' % (guess, [ST[s] for s in st]))
+
+                # a second row intersects the first
+                st2 = paint_guess(wordle, words[0])
+                both = [ok and filter_guess(word, words[0], st2) for word, ok in zip(words, expected)]
+                if list(compile_history([(guess, st), (words[0], st2)]).matches(packed)) != both:
+                    raise ValueError('compile_history mismatch: guess=%s wordle=%s' % (guess, wordle))
+        print('Constraint matches filter_guess for', len(words), 'x', len(words))
+
+    test_constraint(['ABCDE', 'AAXXX', 'AYAYY', 'AYAAY', 'XXXXA', 'YYYAA', 'CCCXX', 'YBBYY', 'XBBXX',
+                     'EERIE', 'EMCEE', 'ABBEY', 'SPEED', 'ERASE', 'GEESE', 'EASEL', 'LEVEE', 'SASSY'])
+
+    from corpus import load_corpus
+
+    combined_wordlist = load_corpus('combined').words
+    common_words = load_corpus('common').words # duplicates and illegal words removed
+
+    from pattern_matrix import load_pattern_matrix
+
+    pmatrix = load_pattern_matrix(combined_wordlist, combined_wordlist)
+    rng = random.Random(2022)
+    test_wordles = rng.sample(common_words, 40)
+    test_wordlist = sorted(set(rng.sample(combined_wordlist, 200) + test_wordles))
+    test_guesses = rng.sample(combined_wordlist, 30) + ['EERIE', 'EMCEE', 'ABBEY', 'SPEED', 'GEESE', 'SASSY']
+
+    def test_list_reduction(wordles, guesses, wordlist):
+        expected = measure_list_reduction(wordles, guesses, wordlist, False, tick_lines=None)
+        results = [
+            ('partition_list_reduction', partition_list_reduction(wordles, guesses, wordlist, tick_lines=None)),
+            ('partition_list_reduction pmatrix',
+             partition_list_reduction(wordles, guesses, wordlist, tick_lines=None, pmatrix=pmatrix)),
+            ('measure_list_reduction pmatrix',
+             measure_list_reduction(wordles, guesses, wordlist, False, tick_lines=None, pmatrix=pmatrix)),
+            ('rank_guesses', rank_guesses(wordles, guesses, wordlist, tick_lines=None)['expected']),
+            ('rank_guesses pmatrix', rank_guesses(wordles, guesses, wordlist, tick_lines=None, pmatrix=pmatrix)['expected']),
+        ]
+        for name, values in results:
+            for guess, a, b in zip(guesses, values, expected):
+                if abs(a - b) > 1e-9:
+                    raise ValueError('%s mismatch: guess=%s %.6f != %.6f' % (name, guess, a, b))
+        print('List reductions match measure_list_reduction for', len(guesses), 'guesses')
+
+    test_list_reduction(test_wordles, test_guesses, test_wordlist)
+
+    def test_branch_and_bound(wordles, guesses, wordlist, k):
+        averages = partition_list_reduction(wordles, guesses, wordlist, tick_lines=None, pmatrix=pmatrix)
+        expected = [(avg, guesses[g]) for avg, g in sorted(zip(averages, range(len(guesses))))[:k]]
+        for pm in [None, pmatrix]:
+            ranked, work = branch_and_bound_search(wordles, guesses, wordlist, k, pm, 16, 32, tick_lines=None)
+            if ranked != expected:
+                raise ValueError('branch_and_bound_search mismatch: %s != %s' % (ranked[:3], expected[:3]))
+        print('branch_and_bound_search matches partition_list_reduction, k=%d, work %.2f' % (k, work))
+
+    bnb_guesses = rng.sample(combined_wordlist, 300) + test_guesses
+    test_branch_and_bound(test_wordles, bnb_guesses, test_wordlist, 1)
+    test_branch_and_bound(test_wordles, bnb_guesses, test_wordlist, 10)
+    test_branch_and_bound(test_wordles[:6], bnb_guesses, test_wordles[:8], 20)  # mostly ties
 
     t0 = time.time()
 
@@ -0,0 +1,199 @@
+"""
+Multi-board play (Dordle, Quordle): every guess is played on several boards at once, each
+with its own hidden wordle, and the game ends when all of them are solved.
+
+A MultiBoard keeps the words still possible on each board - the legal words and the
+likely answers from common_words.txt, as SubsequentMove.py does for one board - and ranks
+the next guess by its joint effect on the unsolved boards with
+matching.rank_guesses_multi: the sum or the product of the boards' average remaining list
+lengths, or the joint entropy of the feedback.  Each guess's patterns are read once for
+the words of all the boards together.
+
+    python multiboard.py -f LARES RRERR CRRRE RRRRE ERRRR      # 4 boards after LARES
+    python multiboard.py --play 50 --boards 4 --seed 1         # simulate Quordle games
+
+The feedback strings use the R / E / C coding of SubsequentMove.py; give one per board, or
+a dash for a board already solved.  --play reports the turns to solve every board and the
+time taken to choose each guess.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from corpus import load_corpus
+from matching import (MULTI_OBJECTIVES, OBJECTIVE_HIGHER_BETTER, ST_CORRECT, compile_constraint, paint_guess,
+                      parse_feedback, rank_guesses_multi)
+from pattern_matrix import load_pattern_matrix
+
+DEFAULT_FIRST_WORD = 'LARES'
+N_SUGGESTIONS = 10
+EXTRA_TURNS = 5  # a game allows the number of boards plus this many guesses (Quordle: 9)
+
+
+class MultiBoard:
+    """
+    Candidate words of every board of one game.
+
+    words[b], packed[b]
+        legal words still possible on board b, and their packed rows
+    wordles[b], packed_wordles[b]
+        likely answers still possible on board b (all of words[b] if there are none)
+    solved[b]
+        True once board b's wordle has been guessed
+    """
+    def __init__(self, n_boards, combined, common, guesses, pmatrix=None):
+        self.combined = combined
+        self.common = common
+        self.guesses = list(guesses)
+        self.guess_set = set(self.guesses)
+        self.pmatrix = pmatrix
+
+        self.words = [combined.words] * n_boards
+        self.packed = [combined.packed] * n_boards
+        self.wordles = [common.words] * n_boards
+        self.packed_wordles = [common.packed] * n_boards
+        self.solved = [False] * n_boards
+
+    def unsolved(self):
+        return [b for b in range(len(self.solved)) if not self.solved[b]]
+
+    def add(self, guess, states):
+        """
+        fold in the feedback for guess: states holds one state per board, None for a board
+        that was already solved
+        """
+        for b, state in enumerate(states):
+            if self.solved[b]:
+                continue
+            if state is None or all(st == ST_CORRECT for st in state):
+                self.solved[b] = True
+                continue
+
+            constraint = compile_constraint(guess, state)
+            self.words[b], self.packed[b] = constraint.reduce(self.words[b], self.packed[b])
+            self.wordles[b], self.packed_wordles[b] = constraint.reduce(self.wordles[b], self.packed_wordles[b])
+            if len(self.wordles[b]) == 0:
+                self.wordles[b], self.packed_wordles[b] = self.words[b], self.packed[b]
+
+    def suggest(self, k=N_SUGGESTIONS, objective='sum'):
+        """
+        the k best next guesses as (score, guess), best first.  The wordles left on the
+        boards are added to the guesses so the game can be finished; ties go to a guess
+        that could solve a board, then alphabetical.
+        """
+        boards = [(self.wordles[b], self.words[b]) for b in self.unsolved()]
+        if len(boards) == 0 or any(len(words) == 0 for wordles, words in boards):
+            return []
+
+        could_win = set()
+        for wordles, words in boards:
+            could_win.update(wordles)
+        guesses = self.guesses + sorted(w for w in could_win if w not in self.guess_set)
+
+        scores = np.array(rank_guesses_multi(boards, guesses, tick_lines=None, pmatrix=self.pmatrix)[objective])
+
+        sign = -1.0 if OBJECTIVE_HIGHER_BETTER[objective] else 1.0
+        order = np.lexsort((np.array(guesses), ~np.isin(guesses, list(could_win)), sign * scores))[:k]
+        return [(float(scores[j]), guesses[j]) for j in order]
+
+
+def load_lists():
+    combined = load_corpus('combined')
+    common = load_corpus('common')
+    pmatrix = load_pattern_matrix(combined.words, combined.words)
+    return combined, common, pmatrix
+
+
+def play(game, wordles, opener, objective='sum', max_turns=None):
+    """
+    play game (a fresh MultiBoard) against wordles, one per board, starting with opener.
+    Returns (guesses played, seconds spent choosing each guess after the opener).
+    """
+    if max_turns is None:
+        max_turns = len(wordles) + EXTRA_TURNS
+
+    guess = opener
+    played, times = [], []
+    while len(played) < max_turns:
+        played += [guess]
+        game.add(guess, [None if game.solved[b] else paint_guess(w, guess) for b, w in enumerate(wordles)])
+        if len(game.unsolved()) == 0:
+            break
+
+        t0 = time.perf_counter()
+        guess = game.suggest(1, objective)[0][1]
+        times += [time.perf_counter() - t0]
+
+    return played, times
+
+
+def simulate(n_games, n_boards, opener, objective='sum', seed=None):
+    combined, common, pmatrix = load_lists()
+    guesses = combined.nrl_words()
+    answers = load_corpus('real').words
+    rng = random.Random(seed)
+
+    turns, failures, times = [], 0, []
+    t0 = time.time()
+    for n in range(n_games):
+        wordles = rng.sample(answers, n_boards)
+        played, game_times = play(MultiBoard(n_boards, combined, common, guesses, pmatrix), wordles, opener, objective)
+        solved = set(wordles) <= set(played)
+        failures += not solved
+        if solved:
+            turns += [len(played)]
+        times += game_times
+        print('%5.5d' % (n + 1), end='\r')
+
+    print('Games: %d, %d boards, objective %s' % (n_games, n_boards, objective))
+    print('Average guesses (solved games): %.3f' % float(np.mean(turns)))
+    print('Failures (more than %d guesses): %d' % (n_boards + EXTRA_TURNS, failures))
+    print('Choosing a guess: mean %.2f sec, max %.2f sec' % (float(np.mean(times)), float(np.max(times))))
+    print('Elapsed %.1f sec' % (time.time() - t0))
+
+
+def _psetup():
+    parser = argparse.ArgumentParser(description='Wordle Multi-Board Solver')
+    parser.add_argument('fb', nargs='*', help='Feedback for each board - strings of E, C, R, or - for a solved board')
+    parser.add_argument('-f', type=str, default=DEFAULT_FIRST_WORD, help='First guess word that was entered')
+    parser.add_argument('--objective', choices=MULTI_OBJECTIVES, default='sum', help='Joint objective to rank guesses by')
+    parser.add_argument('--play', type=int, default=0, help='Simulate this many games instead')
+    parser.add_argument('--boards', type=int, default=4, help='Boards per simulated game')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for the simulated wordles')
+
+    return parser
+
+
+if __name__ == "__main__":
+    args = _psetup().parse_args()
+    first_guess = args.f.upper()
+
+    if args.play > 0:
+        simulate(args.play, args.boards, first_guess, args.objective, args.seed)
+        exit()
+
+    if len(args.fb) == 0:
+        print('Give the feedback for every board, or --play N')
+        exit()
+
+    try:
+        states = [None if fb == '-' else parse_feedback(fb.upper()) for fb in args.fb]
+    except ValueError as e:
+        print(e)
+        exit()
+
+    combined, common, pmatrix = load_lists()
+    game = MultiBoard(len(states), combined, common, combined.nrl_words(), pmatrix)
+    game.add(first_guess, states)
+    for b in range(len(states)):
+        if game.solved[b] or states[b] is None:
+            print('Board %d: solved' % (b + 1))
+        else:
+            print('Board %d: %d words left, %d likely wordles' % (b + 1, len(game.words[b]), len(game.wordles[b])))
+
+    t0 = time.time()
+    for score, guess in game.suggest(N_SUGGESTIONS, args.objective):
+        print('%s %.3f' % (guess, score))
+    print('Elapsed %.2f sec' % (time.time() - t0))
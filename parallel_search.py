@@ -0,0 +1,122 @@
+"""
+Multi-process version of rank_guesses (whose expected scores are partition_list_reduction).
+
+The guess list is split into shards that are handed to a process pool.  The arrays every
+worker needs - the packed guesses and words, the column positions of the wordlist and the
+wordles, and (when a PatternMatrix is available) the block of pattern codes - are placed in
+multiprocessing.shared_memory once, so workers attach to them by name instead of having
+them pickled with every task.  Results come back per shard and are merged in guess order,
+so the output is identical to rank_guesses and can go straight to save_ranked_guesses.
+"""
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from matching import OBJECTIVES, histogram_objectives, pack_words, paint_many, partition_histograms, union_columns
+
+SHARD_ROWS = 128  # guesses per task; small enough to give smooth progress and load balance
+
+_shared = {}  # worker side: name -> ndarray view into shared memory
+_blocks = []  # worker side: keep SharedMemory objects alive while views exist
+
+
+class SharedArrays:
+    """
+    A set of named NumPy arrays copied into shared memory.  spec() describes them so a
+    worker can attach with attach_shared().
+    """
+    def __init__(self, arrays):
+        self.blocks = {}
+        self.layout = {}
+        for name, arr in arrays.items():
+            arr = np.ascontiguousarray(arr)
+            shm = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+            view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+            view[...] = arr
+            self.blocks[name] = shm
+            self.layout[name] = (shm.name, arr.shape, arr.dtype.str)
+
+    def spec(self):
+        return self.layout
+
+    def close(self):
+        for shm in self.blocks.values():
+            shm.close()
+            shm.unlink()
+        self.blocks = {}
+
+
+def _attach(shm_name):
+    try:
+        return shared_memory.SharedMemory(name=shm_name, track=False)
+    except TypeError:  # python < 3.13 has no track argument
+        return shared_memory.SharedMemory(name=shm_name)
+
+
+def attach_shared(spec):
+    """
+    pool initializer: map the arrays described by spec into this process
+    """
+    _shared.clear()
+    for name, (shm_name, shape, dtype) in spec.items():
+        shm = _attach(shm_name)
+        _blocks.append(shm)
+        _shared[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _score_shard(bounds):
+    """
+    worker task: every objective for guesses[g0:g1]
+    """
+    g0, g1 = bounds
+    if 'patterns' in _shared:
+        rows = _shared['patterns'][g0:g1]
+    else:
+        rows = paint_many(_shared['guesses'][g0:g1], _shared['words'])
+
+    hists = partition_histograms(rows, _shared['list_cols'], _shared['wordle_cols'])
+    return g0, histogram_objectives(*hists)
+
+
+def parallel_rank_guesses(wordles, guesses, wordlist, n_workers=None, pmatrix=None, shard_rows=SHARD_ROWS):
+    """
+    Same result as rank_guesses, with the guesses sharded over n_workers processes
+    (default: all cores).
+
+    Without pmatrix each worker paints its shard with paint_many; with pmatrix the parent
+    copies the needed pattern columns into shared memory once and workers only bucket them.
+    """
+    if n_workers is None:
+        n_workers = os.cpu_count()
+
+    words, list_cols, wordle_cols = union_columns(wordlist, wordles)
+    arrays = {
+        'list_cols': list_cols.astype(np.intp),
+        'wordle_cols': wordle_cols,
+    }
+    if pmatrix is not None:
+        arrays['patterns'] = np.asarray(pmatrix.matrix[pmatrix.guess_indices(guesses)][:, pmatrix.answer_indices(words)])
+    else:
+        arrays['guesses'] = pack_words(guesses)
+        arrays['words'] = pack_words(words)
+
+    shared = SharedArrays(arrays)
+    shards = [(g0, min(g0 + shard_rows, len(guesses))) for g0 in range(0, len(guesses), shard_rows)]
+    scores = {name: [None] * len(guesses) for name in OBJECTIVES}
+
+    try:
+        with mp.Pool(n_workers, initializer=attach_shared, initargs=(shared.spec(),)) as pool:
+            done = 0
+            for g0, shard_scores in pool.imap_unordered(_score_shard, shards):
+                n = len(shard_scores['expected'])
+                for name in OBJECTIVES:
+                    scores[name][g0:g0 + n] = shard_scores[name].tolist()
+                done += n
+                print('%5.5d' % done, end='\r')
+    finally:
+        shared.close()
+
+    print('%5.5d' % len(guesses))
+    return scores
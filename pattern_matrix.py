@@ -0,0 +1,122 @@
+"""
+Precomputed guess x answer feedback matrix.
+
+Every (guess, answer) pair is painted once and the resulting state is stored as a
+single base-3 code:
+
+    code = state[0] + 3*state[1] + 9*state[2] + 27*state[3] + 81*state[4]
+
+with state values ST_REJECT (0), ST_CORRECT (1) and ST_ELSEWHERE (2), so every code
+fits in a uint8 (0 - 242).  Words of other lengths (matching.MIN_WORD_LEN to MAX_WORD_LEN)
+have 3**L codes, stored as uint16 above 5 letters (matching.pattern_dtype).  The full
+matrix for combined_wordlist.txt against itself is about 170 MB; it is built once with
+NumPy, saved next to the word lists and memory-mapped on subsequent runs.  The painting
+itself is matching.paint_many.  For long words with large dictionaries the N x N matrix
+gets big (2 bytes a pair); the searches in matching.py paint in bounded blocks instead
+when no matrix is given.
+
+Two candidate words w1, w2 give the same feedback to a guess g exactly when
+matrix[g, w1] == matrix[g, w2], which is what filter_guess tests word by word.
+"""
+import hashlib
+import os
+import time
+
+import numpy as np
+
+from matching import ST_CORRECT, PATTERN_WEIGHTS, pack_words, paint_many, pattern_dtype
+
+PATTERN_FILE = 'pattern_matrix.npy'
+PATTERN_ALL_CORRECT = int(ST_CORRECT * PATTERN_WEIGHTS.sum())
+
+
+def all_correct(length):
+    """
+    pattern code of a solved word of length letters, PATTERN_ALL_CORRECT for 5
+    """
+    return int(ST_CORRECT * (3 ** length - 1) // 2)
+
+
+def encode_state(state):
+    """
+    convert a list of states (as returned by paint_guess) into its base-3 pattern code
+    """
+    code = 0
+    weight = 1
+    for st in state:
+        code += st * weight
+        weight *= 3
+    return code
+
+
+def build_pattern_matrix(guesses, answers, out=None):
+    """
+    compute the (len(guesses), len(answers)) matrix of pattern codes.
+
+    out (array like, optional)
+        destination, e.g. a writable memmap, so the full matrix need not be held in memory
+    """
+    return paint_many(pack_words(guesses), pack_words(answers), out=out)
+
+
+def _word_key(guesses, answers):
+    h = hashlib.sha1()
+    h.update(' '.join(guesses).encode('ascii'))
+    h.update(b'|')
+    h.update(' '.join(answers).encode('ascii'))
+    return h.hexdigest()
+
+
+class PatternMatrix:
+    """
+    Feedback matrix plus the word <-> row/column lookups needed to use it.
+    """
+    def __init__(self, guesses, answers, matrix):
+        self.guesses = list(guesses)
+        self.answers = list(answers)
+        self.matrix = matrix
+        self.guess_index = {w: k for k, w in enumerate(self.guesses)}
+        self.answer_index = {w: k for k, w in enumerate(self.answers)}
+
+    def row(self, guess):
+        """
+        pattern codes for guess against every answer
+        """
+        return np.asarray(self.matrix[self.guess_index[guess]])
+
+    def pattern(self, wordle, guess):
+        return int(self.matrix[self.guess_index[guess], self.answer_index[wordle]])
+
+    def answer_indices(self, words):
+        """
+        column numbers for a list of words, as an int array suitable for fancy indexing
+        """
+        return np.array([self.answer_index[w] for w in words], dtype=np.intp)
+
+    def guess_indices(self, words):
+        return np.array([self.guess_index[w] for w in words], dtype=np.intp)
+
+
+def load_pattern_matrix(guesses, answers, filename=PATTERN_FILE):
+    """
+    return a PatternMatrix for guesses x answers, memory-mapped from filename.  The file is
+    (re)built when it is missing or was built from different word lists.
+    """
+    key_file = filename + '.key'
+    key = _word_key(guesses, answers)
+
+    current = os.path.exists(filename) and os.path.exists(key_file) and open(key_file).read().strip() == key
+    if not current:
+        print('Building pattern matrix %d x %d ...' % (len(guesses), len(answers)))
+        t0 = time.time()
+        mm = np.lib.format.open_memmap(filename, mode='w+', dtype=pattern_dtype(len(guesses[0])),
+                                       shape=(len(guesses), len(answers)))
+        build_pattern_matrix(guesses, answers, out=mm)
+        mm.flush()
+        del mm
+        with open(key_file, 'w') as f:
+            f.write(key + '\n')
+        print('Pattern matrix built in %.1f sec' % (time.time() - t0))
+
+    matrix = np.load(filename, mmap_mode='r')
+    return PatternMatrix(guesses, answers, matrix)
@@ -0,0 +1,156 @@
+"""
+Opt-in call counters and timers for the hot paths.
+
+Turn them on with the environment variable WORDLE_PROFILE=1 or the --profile flag of
+FirstWordSearch.py, SubsequentMove.py and Simulate.py.  When they are off nothing is wrapped
+and stage() hands back a shared do-nothing context, so there is no cost.
+
+When on, every function in HOT_FUNCTIONS is replaced - in its module and in every loaded
+module that imported it - by a wrapper that counts calls and accumulates wall time
+(including time spent in the functions it calls).  Scripts also mark their stages:
+
+    with profiling.stage('rank', items=len(guesses)):
+        ...
+
+At exit a table is printed and the same numbers are written to PROFILE_FILE as JSON:
+calls, seconds, microseconds per call and calls per second for each function, and
+seconds and items per second for each stage.  With a process pool only the parent's
+calls are counted; use -j 1 to see everything.
+"""
+import atexit
+import contextlib
+import functools
+import json
+import os
+import sys
+import time
+
+PROFILE_ENV = 'WORDLE_PROFILE'
+PROFILE_FILE = 'profile.json'
+
+# module -> functions (Class.method for methods) to count
+HOT_FUNCTIONS = {
+    'matching': [
+        'paint_guess', 'filter_guess', 'filter_guess_nrl', 'count_painted_letters', 'filter_word_list',
+        'count_remaining_words', 'reducing_power', 'measure_list_reduction', 'paint_many',
+        'partition_sums', 'partition_histograms', 'histogram_objectives', 'rank_guesses',
+        'partition_list_reduction', 'branch_and_bound_search', 'collapse_guesses', 'rank_guesses_multi',
+        'Constraint.filter', 'Constraint.reduce', 'compile_constraint', 'GuessIndex.hard_mode',
+    ],
+    'solver': ['Solver.solve', 'Solver.lookahead', 'Solver.play'],
+    'pattern_matrix': ['load_pattern_matrix'],
+    'corpus': ['load_corpus'],
+    'export': ['export_ranked'],
+}
+
+_enabled = False
+_functions = {}  # name -> [calls, seconds]
+_stages = {}  # name -> [calls, seconds, items]
+_null_stage = contextlib.nullcontext()
+
+
+def enabled():
+    return _enabled
+
+
+def _wrap(name, fn):
+    counter = _functions.setdefault(name, [0, 0.0])
+
+    @functools.wraps(fn)
+    def counted(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            counter[0] += 1
+            counter[1] += time.perf_counter() - t0
+
+    return counted
+
+
+def enable(filename=PROFILE_FILE):
+    """
+    wrap HOT_FUNCTIONS and report to filename at exit
+    """
+    global _enabled
+    if _enabled:
+        return
+    _enabled = True
+
+    for module_name, names in HOT_FUNCTIONS.items():
+        module = __import__(module_name)
+        for name in names:
+            if '.' in name:
+                cls_name, method = name.split('.')
+                cls = getattr(module, cls_name)
+                setattr(cls, method, _wrap(name, getattr(cls, method)))
+                continue
+
+            original = getattr(module, name)
+            counted = _wrap(name, original)
+            for loaded in list(sys.modules.values()):  # including scripts that did from matching import *
+                if getattr(loaded, name, None) is original:
+                    setattr(loaded, name, counted)
+
+    atexit.register(report, filename)
+
+
+def setup(flag=False, filename=PROFILE_FILE):
+    """
+    enable profiling if flag is set or PROFILE_ENV is set in the environment
+    """
+    if flag or os.environ.get(PROFILE_ENV, '') not in ('', '0'):
+        enable(filename)
+
+
+@contextlib.contextmanager
+def _timed_stage(name, items):
+    counter = _stages.setdefault(name, [0, 0.0, 0])
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        counter[0] += 1
+        counter[1] += time.perf_counter() - t0
+        counter[2] += items or 0
+
+
+def stage(name, items=None):
+    """
+    context manager timing one stage of a script; items (e.g. guesses scored) gives the
+    stage's throughput
+    """
+    if not _enabled:
+        return _null_stage
+    return _timed_stage(name, items)
+
+
+def _rate(n, seconds):
+    return n / seconds if seconds > 0 else 0.0
+
+
+def report(filename=PROFILE_FILE):
+    """
+    print the counters and write them to filename as JSON
+    """
+    if not _enabled:
+        return
+
+    functions = {name: {'calls': calls, 'seconds': seconds,
+                        'usec_per_call': 1e6 * seconds / calls, 'calls_per_sec': _rate(calls, seconds)}
+                 for name, (calls, seconds) in _functions.items() if calls > 0}
+    stages = {name: {'calls': calls, 'seconds': seconds, 'items': items, 'items_per_sec': _rate(items, seconds)}
+              for name, (calls, seconds, items) in _stages.items()}
+
+    print()
+    print('%-28s %10s %10s %12s %14s' % ('stage', 'calls', 'sec', 'items', 'items/sec'))
+    for name, s in stages.items():
+        print('%-28s %10d %10.3f %12d %14.0f' % (name, s['calls'], s['seconds'], s['items'], s['items_per_sec']))
+    print()
+    print('%-28s %10s %10s %12s %14s' % ('function', 'calls', 'sec', 'usec/call', 'calls/sec'))
+    for name, f in sorted(functions.items(), key=lambda item: -item[1]['seconds']):
+        print('%-28s %10d %10.3f %12.1f %14.0f' % (name, f['calls'], f['seconds'], f['usec_per_call'], f['calls_per_sec']))
+
+    with open(filename, 'w') as f:
+        json.dump({'argv': sys.argv, 'stages': stages, 'functions': functions}, f, indent=2)
+    print('Profile written to', filename)
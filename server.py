@@ -0,0 +1,203 @@
+"""
+Local solver service: keeps the word lists and the pattern matrix loaded and answers
+next-move questions over HTTP/JSON.
+
+    python server.py -j 4                      # serve on localhost:8765 with 4 worker processes
+
+    POST /suggest
+        {"history": [["LARES", "RRERR"], ["COUNT", "RRCRR"]], "k": 10, "objective": "expected"}
+
+        history is the list of guesses so far with their feedback in the R / E / C coding
+        of SubsequentMove.py; k, objective (see matching.OBJECTIVES) and max_candidates are
+        optional.  The reply holds the k best next guesses with every objective's score and
+        the remaining candidate words (at most max_candidates of them, by usage):
+
+        {"suggestions": [{"guess": "PINTO", "expected": 1.3, "entropy": ..., ...}, ...],
+         "n_candidates": 19, "n_wordles": 7, "candidates": ["POINT", ...]}
+
+        n_wordles counts the candidates in common_words.txt, the likely answers the guesses
+        are scored against (all candidates if there are none).
+
+    GET /health
+        {"status": "ok", "workers": 4}
+
+Requests are handled by a thread each and passed to a process pool; every worker loads its
+own Engine once (the pattern matrix is memory-mapped, so the pages are shared) and keeps the
+answers for recent histories.  Bad requests get status 400 with {"error": ...}.
+See loadtest.py for a load-test client.
+"""
+import argparse
+import functools
+import json
+import multiprocessing as mp
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from corpus import load_corpus
+from matching import OBJECTIVE_HIGHER_BETTER, OBJECTIVES, compile_history, parse_feedback, rank_guesses
+from pattern_matrix import load_pattern_matrix
+
+DEFAULT_PORT = 8765
+N_SUGGESTIONS = 10
+MAX_CANDIDATES = 100
+HISTORY_CACHE = 1024  # histories whose rankings each worker keeps
+
+_engine = None  # per worker process, see _init_worker
+
+
+class Engine:
+    """
+    The word lists, guess list and pattern matrix, loaded once, and the ranking of the next
+    guesses for a history - the same search SubsequentMove.py does.
+    """
+    def __init__(self):
+        self.combined = load_corpus('combined')
+        self.common = load_corpus('common')
+        self.guesses = self.combined.nrl_words()
+        self.guess_set = set(self.guesses)
+        self.pmatrix = load_pattern_matrix(self.combined.words, self.combined.words)
+        self.rank = functools.lru_cache(HISTORY_CACHE)(self._rank)
+
+    def _rank(self, history):
+        """
+        (candidates, wordles, guesses, scores) after history, a tuple of (guess, feedback
+        string).  The wordles left are added to the guesses so the game can be finished.
+        """
+        constraint = compile_history([(guess, parse_feedback(fb)) for guess, fb in history])
+        candidates = constraint.filter(self.combined.words, self.combined.packed)
+        wordles = constraint.filter(self.common.words, self.common.packed) or candidates
+
+        guesses = self.guesses + [w for w in wordles if w not in self.guess_set]
+        scores = None
+        if len(candidates) > 0:
+            scores = rank_guesses(wordles, guesses, candidates, tick_lines=None, pmatrix=self.pmatrix)
+        return candidates, wordles, guesses, scores
+
+    def suggest(self, history, k=N_SUGGESTIONS, objective='expected', max_candidates=MAX_CANDIDATES):
+        """
+        reply for a /suggest request, see the module docstring.  Raises ValueError for a
+        malformed history or option.
+        """
+        if objective not in OBJECTIVES:
+            raise ValueError('Unknown objective %s, expected one of %s' % (objective, ', '.join(OBJECTIVES)))
+        k, max_candidates = int(k), int(max_candidates)
+        if k < 1:
+            raise ValueError('k must be at least 1, got %d' % k)
+        if max_candidates < 0:
+            raise ValueError('max_candidates must not be negative, got %d' % max_candidates)
+
+        rows = []
+        for row in history:
+            if len(row) != 2:
+                raise ValueError('History rows must be [guess, feedback]')
+            guess, fb = str(row[0]).upper(), str(row[1]).upper()
+            if len(guess) != 5 or not (guess.isascii() and guess.isalpha()):
+                raise ValueError('Guess <%s> is not a 5-letter word' % guess)
+            parse_feedback(fb)
+            rows += [(guess, fb)]
+
+        candidates, wordles, guesses, scores = self.rank(tuple(rows))
+
+        suggestions = []
+        if scores is not None:
+            # best first; ties go to a guess that could itself be the answer, then alphabetical
+            sign = -1.0 if OBJECTIVE_HIGHER_BETTER[objective] else 1.0
+            could_win = np.isin(guesses, wordles)
+            for j in np.lexsort((np.array(guesses), ~could_win, sign * np.array(scores[objective])))[:k]:
+                suggestions += [dict([('guess', guesses[j])] + [(name, scores[name][j]) for name in OBJECTIVES])]
+
+        by_usage = sorted(candidates, key=lambda w: self.common.index.get(w, len(self.common)))
+        return {
+            'suggestions': suggestions,
+            'n_candidates': len(candidates),
+            'n_wordles': len(wordles),
+            'candidates': by_usage[:max_candidates],
+        }
+
+
+def _init_worker():
+    global _engine
+    _engine = Engine()
+    _engine.suggest([])  # the opening ranking is the slowest; have it ready
+
+
+def _suggest(request):
+    """
+    worker task: (status, reply) for a decoded /suggest body
+    """
+    try:
+        if not isinstance(request, dict):
+            raise ValueError('Request body must be a JSON object')
+        options = {name: request[name] for name in ('k', 'objective', 'max_candidates') if name in request}
+        return 200, _engine.suggest(request.get('history', []), **options)
+    except (ValueError, TypeError) as e:
+        return 400, {'error': str(e)}
+
+
+class SolverHandler(BaseHTTPRequestHandler):
+    """
+    request handler; self.server.pool is the worker pool
+    """
+    def reply(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.reply(200, {'status': 'ok', 'workers': self.server.n_workers})
+        else:
+            self.reply(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if self.path != '/suggest':
+            self.reply(404, {'error': 'Not found'})
+            return
+
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        except ValueError:
+            self.reply(400, {'error': 'Request body is not JSON'})
+            return
+
+        self.reply(*self.server.pool.apply(_suggest, (request,)))
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+def serve(host, port, n_workers, verbose=False):
+    with mp.Pool(n_workers, initializer=_init_worker) as pool:
+        server = ThreadingHTTPServer((host, port), SolverHandler)
+        server.pool = pool
+        server.n_workers = n_workers
+        server.verbose = verbose
+
+        pool.map(abs, range(n_workers))  # returns once workers are up; each loads its Engine first
+        print('Solver service on http://%s:%d with %d worker(s)' % (host, server.server_port, n_workers))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.server_close()
+
+
+def _psetup():
+    parser = argparse.ArgumentParser(description='Wordle Solver Service')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port to listen on')
+    parser.add_argument('-j', type=int, default=0, help='Number of worker processes (0 = all cores)')
+    parser.add_argument('-v', action='store_true', help='Log every request')
+
+    return parser
+
+
+if __name__ == "__main__":
+    args = _psetup().parse_args()
+    serve(args.host, args.port, args.j if args.j > 0 else os.cpu_count(), args.v)
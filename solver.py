@@ -0,0 +1,238 @@
+"""
+Game-playing engine on top of the pattern matrix.
+
+A Solver holds the pattern rows for a fixed guess vocabulary against the answer list and
+the word list, and picks guesses with the SubsequentMove.py objective - the lowest average
+remaining list length, computed with partition_sums.  A game position is the pair of
+column arrays (wordles still possible, words still possible); positions reached by
+different games or guess paths are solved once and remembered in a TranspositionTable,
+which can be saved and reloaded between runs.
+
+lookahead() scores a guess two plies deep instead: the total remaining list length when
+every feedback bucket is followed by its own best guess.
+
+play(..., hard=True) keeps to hard-mode rules: each guess is chosen from the words that
+keep the greens and reuse the revealed letters, found with a GuessIndex.
+"""
+import hashlib
+
+import numpy as np
+
+from matching import Constraint, GuessIndex, collapse_guesses, pack_words, paint_guess, partition_sums
+from pattern_matrix import all_correct, encode_state
+from transposition import TABLE_BYTES, TranspositionTable, position_key
+
+LOOKAHEAD_WIDTH = 50  # guess classes, best one-ply first, searched two plies deep
+LOOKAHEAD_TOP = 10  # lookahead results kept; guesses that can't make these are abandoned
+
+
+class Solver:
+    """
+    guesses
+        guess vocabulary (e.g. non_nrl_guesses); the answers are added so the solver can
+        always finish
+    answers
+        the possible hidden wordles
+    wordlist
+        words counted as still possible when scoring a guess, as reduced_wordlist in
+        SubsequentMove.py.  Defaults to answers.
+    table_bytes
+        memory budget of the transposition table
+    """
+    def __init__(self, pmatrix, guesses, answers, wordlist=None, table_bytes=TABLE_BYTES):
+        if wordlist is None:
+            wordlist = answers
+
+        in_guesses = set(guesses)
+        self.words = list(guesses) + [w for w in answers if w not in in_guesses]
+        self.word_pos = {w: k for k, w in enumerate(self.words)}
+
+        # columns: wordlist, then any answers not in it
+        in_list = set(wordlist)
+        self.columns = list(wordlist) + [w for w in answers if w not in in_list]
+        col = {w: k for k, w in enumerate(self.columns)}
+        self.answer_cols = np.array([col[w] for w in answers], dtype=np.intp)
+        self.list_cols = np.arange(len(wordlist), dtype=np.intp)
+
+        rows = np.asarray(pmatrix.matrix[pmatrix.guess_indices(self.words)])
+        self.rows = np.ascontiguousarray(rows[:, pmatrix.answer_indices(self.columns)])
+
+        self.is_answer = np.zeros(len(self.words), dtype=bool)
+        self.is_answer[[self.word_pos[w] for w in answers]] = True
+        self.col_to_word = {int(c): self.word_pos[self.columns[c]] for c in self.answer_cols}
+        self.index = GuessIndex(pack_words(self.words))
+        self.length = len(self.words[0])
+        self.solved_pattern = all_correct(self.length)
+
+        self.table = TranspositionTable(table_bytes)
+        # identifies the rows and columns, so a saved table is only reused by the same setup
+        self.config = hashlib.sha1(('\n'.join(self.words) + '\n\n' + '\n'.join(self.columns) + '\n\n' +
+                                    '\n'.join(answers)).encode('ascii')).hexdigest()
+
+    def load_table(self, filename):
+        """
+        add the positions saved by save_table, if the file is for this solver's word lists
+        """
+        return self.table.load(filename, self.config)
+
+    def save_table(self, filename):
+        self.table.save(filename, self.config)
+
+    def start(self):
+        """
+        the position before any guess: (wordle columns, wordlist columns)
+        """
+        return self.answer_cols, self.list_cols
+
+    def position(self, wordles, wordlist):
+        """
+        the position in which wordles (a subset of answers) and wordlist (a subset of the
+        solver's wordlist) are still possible
+        """
+        col = {w: k for k, w in enumerate(self.columns)}
+        return (np.array([col[w] for w in wordles], dtype=np.intp),
+                np.array([col[w] for w in wordlist], dtype=np.intp))
+
+    def split(self, g, position, pattern):
+        """
+        the position after guess row g receives feedback pattern
+        """
+        w_cols, l_cols = position
+        return w_cols[self.rows[g, w_cols] == pattern], l_cols[self.rows[g, l_cols] == pattern]
+
+    def best_guess(self, position, allowed=None):
+        """
+        guess row with the lowest average remaining list length over the position's wordles;
+        ties go to a guess that could itself be the answer.  allowed is an optional boolean
+        mask of the rows that may be played (hard mode).
+        """
+        w_cols, l_cols = position
+
+        if len(w_cols) <= 2:
+            return self.col_to_word[int(w_cols[0])]
+
+        return self.solve(position, allowed)[0]
+
+    def solve(self, position, allowed=None):
+        """
+        (best guess row, its total remaining list length over the position's wordles) for a
+        position with at least two wordles, through the transposition table.  With allowed,
+        a boolean mask over the rows, only those rows are considered.
+        """
+        w_cols, l_cols = position
+        key = position_key(w_cols, l_cols, len(self.columns))
+        if allowed is not None:  # the same position under other rules is another entry
+            key = hashlib.blake2b(key + np.packbits(allowed).tobytes(), digest_size=16).digest()
+        result = self.table.get(key)
+        if result is not None:
+            return result
+
+        if allowed is None:
+            sums = partition_sums(self.rows, l_cols, w_cols)
+            best = int(np.argmin(2 * sums + ~self.is_answer))
+        else:
+            rows = np.nonzero(allowed)[0]
+            sums = partition_sums(self.rows[rows], l_cols, w_cols)
+            best = int(rows[np.argmin(2 * sums + ~self.is_answer[rows])])
+
+        # a guess that can't split the wordles makes no progress - just play one of them
+        if not self.is_answer[best] and len(np.unique(self.rows[best, w_cols])) == 1:
+            best = self.col_to_word[int(w_cols[0])]
+
+        result = (best, int(sums.min()))
+        self.table.put(key, *result)
+        return result
+
+    def best_sum(self, position):
+        """
+        the lowest total remaining list length, over the position's wordles, that any one
+        guess leaves
+        """
+        w_cols, l_cols = position
+        if len(w_cols) == 1:  # guess it: only the wordle itself can remain
+            return int(np.isin(w_cols, l_cols)[0])
+
+        return self.solve(position)[1]
+
+    def lookahead(self, position, width=LOOKAHEAD_WIDTH, top=LOOKAHEAD_TOP):
+        """
+        Two-ply (expectimax) scores for the position: for a guess g, the total over every
+        feedback bucket of best_sum of the bucket, divided by the number of wordles - the
+        average remaining list length when g is followed by the best guess for the feedback.
+
+        Guesses that split the position's words identically score the same, so one guess
+        per class (collapse_guesses) is searched, and only the width classes with the best
+        one-ply score.  Bucket positions are remembered, so a bucket reached by several
+        guesses is solved once.  A bucket's best_sum is at least its number of wordles that
+        are also in the list, so a guess is abandoned once that bound shows it can't make
+        the top best.
+
+        Returns a list of up to top (two-ply score, one-ply score, guess row), best first.
+        """
+        w_cols, l_cols = position
+        cols = np.union1d(w_cols, l_cols)
+        representatives, classes = collapse_guesses(self.rows[:, cols])
+
+        one_ply = partition_sums(self.rows[representatives], l_cols, w_cols)
+        # ties to a guess that could itself be the answer, as best_guess
+        order = np.argsort(2 * one_ply + ~self.is_answer[representatives], kind='stable')[:width]
+
+        in_list = np.isin(w_cols, l_cols)
+
+        n = float(len(w_cols))
+        scored = []  # (total, one-ply total, guess row), best first
+        for r in order:
+            g = int(representatives[r])
+            patterns, sizes = np.unique(self.rows[g, w_cols], return_counts=True)
+            bounds = np.bincount(np.searchsorted(patterns, self.rows[g, w_cols[in_list]]), minlength=len(patterns))
+            todo = np.argsort(-sizes, kind='stable')  # big buckets first, they decide
+            left = int(bounds.sum())
+
+            bound = scored[-1][0] if len(scored) == top else None
+            total = 0
+            for b in todo:
+                left -= int(bounds[b])
+                total += self.best_sum(self.split(g, position, patterns[b]))
+                if bound is not None and total + left > bound:
+                    break
+            else:
+                scored = sorted(scored + [(total, int(one_ply[r]), g)])[:top]
+
+        return [(total / n, one / n, g) for total, one, g in scored]
+
+    def play(self, wordle, opener, max_turns=10, hard=False):
+        """
+        play a game against wordle starting with opener; returns the list of guesses, which
+        ends with wordle if it was solved within max_turns.  With hard, every guess after the
+        opener obeys hard-mode rules.
+        """
+        position = self.start()
+        constraint = Constraint(self.length)
+        allowed = None
+        g = self.word_pos[opener]
+        played = []
+        while len(played) < max_turns:
+            guess = self.words[g]
+            played += [guess]
+            if guess == wordle:
+                break
+
+            state = paint_guess(wordle, guess)
+            position = self.split(g, position, encode_state(state))
+            if len(position[0]) == 0:  # wordle is not in the answer list
+                break
+            if hard:
+                allowed = self.index.hard_mode(constraint.add(guess, state))
+            g = self.best_guess(position, allowed)
+
+        return played
+
+    def children(self, g, position):
+        """
+        (pattern, position) for every feedback guess row g can receive in position, except
+        the all-correct pattern
+        """
+        w_cols = position[0]
+        for p in np.unique(self.rows[g, w_cols]):
+            if p != self.solved_pattern:
+                yield int(p), self.split(g, position, p)
@@ -1,4 +1,6 @@
+import numpy as np
 
+UNRANKED = 30000  # usage rank given to words not in the common word list
 
 def score_word(wrd, alpha_dist):
     """
@@ -61,27 +63,88 @@ def sort_by_score(wrds, scores):
     z_sort = sorted(zip(scores, wrds), reverse=True)
     return [el for _,el in z_sort]
 
-def sort_by_usage(wrds, c_words):
+def build_usage_rank(c_words):
+    """
+    return a dict mapping each word in the ordered common-word list to its rank (position
+    of first occurrence), for sort_by_usage
+    """
+    rank = {}
+    for k, w in enumerate(c_words):
+        if w not in rank:
+            rank[w] = k
+    return rank
+
+def sort_by_usage(wrds, c_words, rank=None):
     """
     return the sorted wrds list, sorting according to the ordered list of coomon words.
+
+    rank (dict, optional)
+        prebuilt build_usage_rank(c_words); pass it when sorting repeatedly against the
+        same common-word list
     """
-    cindex = []
+    if rank is None:
+        rank = build_usage_rank(c_words)
 
-    for w in wrds:
-        if w in c_words:
-            cindex += [c_words.index(w)]
+    return sorted(wrds, key=lambda w: (rank.get(w, UNRANKED), w))
+
+class WordScorer:
+    """
+    score_words for a changing subset of a fixed dictionary, e.g. the GUI's list of
+    currently possible words.
+
+    The unique letters of every dictionary word are tabulated once.  The alphabet
+    histogram for the current subset is kept and updated incrementally from the words
+    added/removed since the last call (or rebuilt from the subset if that is smaller),
+    and the scores for the subset are then a single matrix product.
+    """
+    def __init__(self, wrds):
+        self.index = {w: k for k, w in enumerate(wrds)}
+
+        self.letters = np.zeros((len(wrds), 26), dtype=np.int64)
+        for k, ew in enumerate(remove_duplicate_letters(wrds)):
+            for l in ew:
+                self.letters[k, ord(l) - ord('A')] = 1
+
+        self.current = np.zeros(len(wrds), dtype=bool)
+        self.alpha = np.zeros(26, dtype=np.int64)
+
+    def set_words(self, wrds):
+        """
+        make wrds the list the letter histogram is taken over
+        """
+        new = np.zeros(len(self.current), dtype=bool)
+        new[[self.index[w] for w in wrds]] = True
+
+        changed = new != self.current
+        n_changed = int(np.count_nonzero(changed))
+        if n_changed == 0:
+            return
+
+        if n_changed < len(wrds):
+            added = changed & new
+            removed = changed & self.current
+            self.alpha += self.letters[added].sum(axis=0) - self.letters[removed].sum(axis=0)
         else:
-            cindex += [30000]
+            self.alpha = self.letters[new].sum(axis=0)
 
-    z_sort = sorted(zip(cindex, wrds), reverse=False)
-    return [el for _,el in z_sort]
+        self.current = new
+
+    def scores(self, wrds):
+        """
+        same result as score_words(wrds)
+        """
+        self.set_words(wrds)
+        ndx = [self.index[w] for w in wrds]
+        return (self.letters[ndx] @ self.alpha).tolist()
 
 
 if __name__ == "__main__":
 
-    words = [line.strip().upper() for line in open("combined_wordlist.txt")]
-    words = sorted(words[1:])  #get rid of first line comment
-    common_words = [line.strip().upper() for line in open("common_words.txt")]
+    from corpus import load_corpus
+
+    combined = load_corpus('combined')
+    words = combined.words
+    common_words = load_corpus('common').words
 
     print(len(words), ' words')
 
@@ -107,7 +170,7 @@ if __name__ == "__main__":
         print(s_words[k])
 
     print('sort by usage')
-    s_words = sort_by_usage(words, common_words)
+    s_words = sort_by_usage(words, common_words, combined.usage_rank())
     for k in range(10):
         print(s_words[k])
 
@@ -0,0 +1,88 @@
+"""
+Transposition table for the solver: remembers the result of solving a position so that a
+position reached again - by another guess path, another game or another run - is not
+searched twice.
+
+A position is the set of wordles and the set of words still possible.  Its key is a
+16-byte hash of the two sets as bitsets over the solver's columns, so the order in which
+the words were filtered doesn't matter.  Each entry holds the best guess and its score.
+
+The table keeps at most max_bytes worth of entries (ENTRY_BYTES each) and evicts the least
+recently used one when full.  save() / load() keep it in an .npz file between runs; the file
+records a key for the solver's word lists and is ignored if they have changed.
+"""
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+TABLE_BYTES = 64 << 20  # default memory budget
+ENTRY_BYTES = 256  # approximate cost of one entry: key, value tuple, dict slot
+
+
+def position_key(w_cols, l_cols, n_columns):
+    """
+    16-byte key for the position (w_cols, l_cols) over n_columns columns
+    """
+    mask = np.zeros(2 * n_columns, dtype=bool)
+    mask[w_cols] = True
+    mask[n_columns + np.asarray(l_cols)] = True
+    return hashlib.blake2b(np.packbits(mask).tobytes(), digest_size=16).digest()
+
+
+class TranspositionTable:
+    """
+    LRU map position key -> (best guess, score), see position_key
+    """
+    def __init__(self, max_bytes=TABLE_BYTES):
+        self.max_entries = max(1, max_bytes // ENTRY_BYTES)
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        (best guess, score) for key, or None
+        """
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, guess, score):
+        self.entries[key] = (guess, score)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def save(self, filename, config):
+        """
+        write the entries, least recently used first, for the solver described by config
+        """
+        keys = np.frombuffer(b''.join(self.entries.keys()), dtype=np.uint8).reshape(-1, 16)
+        values = list(self.entries.values())
+        np.savez(filename, config=np.array(config), keys=keys,
+                 guesses=np.array([g for g, s in values], dtype=np.int32),
+                 scores=np.array([s for g, s in values], dtype=np.int64))
+
+    def load(self, filename, config):
+        """
+        add the entries saved in filename, if it exists and was saved for config.  Returns
+        the number of entries read.
+        """
+        if not os.path.exists(filename):
+            return 0
+
+        with np.load(filename) as data:
+            if str(data['config']) != config:
+                return 0
+            for key, guess, score in zip(data['keys'], data['guesses'].tolist(), data['scores'].tolist()):
+                self.put(key.tobytes(), guess, score)
+            return len(data['keys'])
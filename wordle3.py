@@ -16,16 +16,20 @@ https://github.com/Kinkelin/WordleCompetition
 
 """
 import sys
-from stats import score_words, sort_by_score, sort_by_usage
+from stats import WordScorer, sort_by_score, sort_by_usage
 import json
+import numpy as np
 #from english_words import english_words_lower_alpha_set
 from PyQt5 import QtGui, QtCore, QtWidgets
 
-from matching import filter_word_list, paint_guess
+from corpus import load_corpus
+from matching import GuessIndex, compile_constraint, compile_history, iter_top_guesses
 
 #words = sorted([w for w in english_words_lower_alpha_set if len(w) == 5])
 #print(len(words))
-TURN_ROWS = 6
+WORD_LEN = 5  # letters per word, as the word lists loaded below
+TURN_ROWS = 6  # guesses allowed in a game
+N_SUGGESTIONS = 10
 # Letter box states:
 
 ST_REJECT = 0
@@ -49,9 +53,9 @@ grid_font = QtGui.QFont('Ariel', 18)
 
 def get_letter_states(wordle, guess):
 
-    state = [None]*5
+    state = [None]*len(guess)
 
-    for ltr in range(5):
+    for ltr in range(len(guess)):
         if  guess[ltr] == wordle[ltr]:
             state[ltr] = ST_CORRECT
         elif guess[ltr] not in wordle:
@@ -63,13 +67,13 @@ def get_letter_states(wordle, guess):
     # count up how many times this letter appears in wordle
     # if a less than b, set as ELSEWHERE
 
-    for ltr in range(5):
+    for ltr in range(len(guess)):
         if state[ltr] is not None:
             continue
 
         letter_count = wordle.count(guess[ltr])
         mark_count = 0
-        for k in range(5):
+        for k in range(len(guess)):
             if k == ltr:
                 continue
             if guess[k] == guess[ltr] and state[k] == ST_ELSEWHERE:
@@ -134,16 +138,96 @@ class LetterBox(QtWidgets.QLabel):
         self.update_function()
 
 
+class SuggestionWorker(QtCore.QObject):
+    """
+    Filters the word list and ranks guesses off the GUI thread.  run() is called through a
+    queued signal with a job number; latest is set by the window to the newest job, and a
+    job that is no longer the newest stops at its next check, so a stale computation never
+    holds up the current one.  Results go back to the window through the signals, tagged
+    with their job number.  In hard mode the suggestions are ranked from the words that keep
+    the greens and reuse the revealed letters (hard_index).
+    """
+    candidates_ready = QtCore.pyqtSignal(int, list)  # job, possible words in display order
+    suggestions_ready = QtCore.pyqtSignal(int, list, int, int)  # job, [(avg list left, guess)], guesses scored, of
+
+    def __init__(self):
+        super().__init__()
+        self.latest = 0
+
+        # per filled grid row: (row key, words left, packed words left), see filtered_words
+        self.row_cache = []
+
+    @QtCore.pyqtSlot(int, list, bool, bool)
+    def run(self, job, rows, by_score, hard):
+        if job != self.latest:
+            return
+
+        newlist = self.filtered_words(rows, job)
+        if newlist is None:
+            return
+
+        if by_score or len(rows) == 0:
+            self.candidates_ready.emit(job, sort_by_score(newlist, scorer.scores(newlist)))
+        else:
+            self.candidates_ready.emit(job, sort_by_usage(newlist, common_words, usage_rank))
+
+        if len(rows) == 0 or len(newlist) == 0:
+            return
+
+        # best next guesses, posted as each block of guesses is scored
+        in_list = set(newlist)
+        wordles = [w for w in common_words if w in in_list] or newlist
+        allowed = guesses
+        if hard:
+            allowed = [words[k] for k in np.nonzero(hard_index.hard_mode(compile_history(rows)))[0]]
+        for top, n_scored in iter_top_guesses(wordles, allowed, newlist, N_SUGGESTIONS):
+            if job != self.latest:
+                return
+            self.suggestions_ready.emit(job, top, n_scored, len(allowed))
+
+    def filtered_words(self, rows, job):
+        """
+        return the words that fit every (word, state) row, or None if job was superseded.
+        The list left after each row is cached, so a change to row r only re-filters the
+        (short) list left after row r-1.
+        """
+        newlist, packed = words, packed_words
+
+        for k, key in enumerate(rows):
+            if job != self.latest:
+                return None
+
+            if k < len(self.row_cache) and self.row_cache[k][0] == key:
+                _, newlist, packed = self.row_cache[k]
+            else:
+                del self.row_cache[k:]
+                newlist, packed = compile_constraint(*key).reduce(newlist, packed)
+                self.row_cache += [(key, newlist, packed)]
+
+        del self.row_cache[len(rows):]
+        return newlist
+
+
 class ApplicationWindow(QtWidgets.QMainWindow):
+    compute_requested = QtCore.pyqtSignal(int, list, bool, bool)  # job, grid rows, sort by score, hard mode
+
     def __init__(self):
         super().__init__()
         self.setAttribute(QtCore.Qt.WA_DeleteOnClose)
         self.setWindowTitle('Wordle Solver')
 
-        self.real_wordles = [line.strip().upper() for line in open("shuffled_real_wordles.txt")]
-        self.real_wordles = self.real_wordles[1:] # skip over comment line
+        self.real_wordles = load_corpus('real').words
         self.current_wordle = -1
 
+        self.job = 0
+        self.worker = SuggestionWorker()
+        self.worker_thread = QtCore.QThread()
+        self.worker.moveToThread(self.worker_thread)
+        self.compute_requested.connect(self.worker.run)
+        self.worker.candidates_ready.connect(self.post_candidates)
+        self.worker.suggestions_ready.connect(self.post_suggestions)
+        self.worker_thread.start()
+
         self.setup_gui()
         self.box_ptr = 0
 
@@ -156,49 +240,62 @@ class ApplicationWindow(QtWidgets.QMainWindow):
 
     def update_list(self):
         """
-        update the word list box given current constraints
-        :return:
+        update the word list box given current constraints.  The work is done by the
+        SuggestionWorker; any computation still running for an older grid is abandoned.
         """
+        self.job += 1
+        self.worker.latest = self.job
 
-        def post_new_wlist(nlist):
-            self.possible_box.clear()
+        self.possible_label.setText('Working ...')
+        self.suggest_box.clear()
+        self.suggest_label.setText('Best guesses')
 
-            for w in nlist:
-                item = QtWidgets.QListWidgetItem(w)
-                item.setTextAlignment(QtCore.Qt.AlignHCenter)
-                self.possible_box.addItem(item)
+        self.compute_requested.emit(self.job, self.grid_rows(), self.sort_button_score.isChecked(),
+                                    self.hard_mode_box.isChecked())
 
-            nw = len(nlist)
-            s = 's' if nw != 1 else ''
-            self.possible_label.setText('%d possible word%s' % (nw, s))
+    def grid_rows(self):
+        """
+        (word, state) for every filled grid row
+        """
+        rows = []
+        for r in self.box_row:
+            this_row_word = ''.join(b.text() for b in r)
+            if len(this_row_word) == 0:
+                continue
+            rows += [(this_row_word, tuple(b.state for b in r))]
+        return rows
 
-        if self.box_ptr == 0:
-            scores = score_words(words)
-            post_new_wlist(sort_by_score(words, scores))
+    def post_candidates(self, job, nlist):
+        if job != self.job:
             return
 
-        maxrow = max(0, (self.box_ptr-1) // 5)
+        self.possible_box.clear()
 
-        newlist = words
+        for w in nlist:
+            item = QtWidgets.QListWidgetItem(w)
+            item.setTextAlignment(QtCore.Qt.AlignHCenter)
+            self.possible_box.addItem(item)
 
-        for r in self.box_row:
+        nw = len(nlist)
+        s = 's' if nw != 1 else ''
+        self.possible_label.setText('%d possible word%s' % (nw, s))
 
-            this_row_word = []
-            this_row_state = []
-            for b in r:
-                letter = b.text()
-                this_row_word += letter
-                this_row_state += [b.state]
+    def post_suggestions(self, job, top, n_scored, n_guesses):
+        if job != self.job:
+            return
 
-            if len(this_row_word) > 0:
-                newlist = filter_word_list(newlist, this_row_word, this_row_state)
+        self.suggest_box.clear()
+        for avg, guess in top:
+            self.suggest_box.addItem('%s %6.1f' % (guess, avg))
 
-        if self.sort_button_score.isChecked():
-            scores = score_words(newlist)
-            post_new_wlist(sort_by_score(newlist, scores))
-        else:
-            post_new_wlist(sort_by_usage(newlist, common_words))
+        done = '' if n_scored == n_guesses else ' (%d%%)' % (100 * n_scored // n_guesses)
+        self.suggest_label.setText('Best guesses%s' % done)
 
+    def closeEvent(self, event):
+        self.worker.latest = -1  # abandon any running job
+        self.worker_thread.quit()
+        self.worker_thread.wait()
+        super().closeEvent(event)
 
     def setup_gui(self):
 
@@ -233,7 +330,7 @@ class ApplicationWindow(QtWidgets.QMainWindow):
             letter_layout = QtWidgets.QHBoxLayout()
 
             letter_box = []
-            for k in range(5):
+            for k in range(WORD_LEN):
                 b = LetterBox(self.update_list)
                 letter_layout.addWidget(b)
                 letter_box += [b]
@@ -279,8 +376,21 @@ class ApplicationWindow(QtWidgets.QMainWindow):
         layV2.addWidget(self.sort_button_usage)
         layV2.addWidget(self.possible_box)
 
+        layV3 = QtWidgets.QVBoxLayout()
+        self.hard_mode_box = QtWidgets.QCheckBox('Hard mode')
+        self.hard_mode_box.clicked.connect(self.hard_mode_callback)
+        self.suggest_label = QtWidgets.QLabel('Best guesses')
+        self.suggest_box = QtWidgets.QListWidget()
+        self.suggest_box.setFont(fixed_font)
+        self.suggest_box.setMaximumWidth(160)
+        self.suggest_box.itemClicked.connect(self.suggestion_clicked_callback)
+        layV3.addWidget(self.hard_mode_box)
+        layV3.addWidget(self.suggest_label)
+        layV3.addWidget(self.suggest_box)
+
         layout.addLayout(layV1)
         layout.addLayout(layV2)
+        layout.addLayout(layV3)
 
         self.main_widget.setLayout(layout)
 
@@ -291,7 +401,7 @@ class ApplicationWindow(QtWidgets.QMainWindow):
         self.letter_entry_box.clear()
 
         for row in range(TURN_ROWS):
-            for k in range(5):
+            for k in range(WORD_LEN):
                 bx = self.box_row[row][k]
                 bx.setText('')
                 bx.state = ST_REJECT
@@ -306,7 +416,7 @@ class ApplicationWindow(QtWidgets.QMainWindow):
         if self.current_wordle < 0:
             return
 
-        row, col = self.box_ptr // 5, self.box_ptr % 5
+        row, col = self.box_ptr // WORD_LEN, self.box_ptr % WORD_LEN
         if row >= TURN_ROWS:
             return
         if row == 0:
@@ -320,7 +430,7 @@ class ApplicationWindow(QtWidgets.QMainWindow):
 
         state = get_letter_states(self.real_wordles[self.current_wordle], guess)
 
-        for k in range(5):
+        for k in range(WORD_LEN):
             bx = self.box_row[row-1][k]
             bx.state = state[k]
             bx.style_from_state()
@@ -332,27 +442,18 @@ class ApplicationWindow(QtWidgets.QMainWindow):
         self.next_wordle_label.setText('%s %s' % (self.current_wordle, self.real_wordles[self.current_wordle]))
 
     def sort_score_callback(self):
-        currently_legal_words = [self.possible_box.item(x).text() for x in range(self.possible_box.count())]
-        self.possible_box.clear()
-
-        scores = score_words(words)
-
-        sorted_words = sort_by_score(currently_legal_words, scores)
-        for w in sorted_words:
-            self.possible_box.addItem(w)
+        self.update_list()  # the worker owns the scorer; the filtered list comes from its cache
 
     def sort_usage_callback(self):
-        currently_legal_words = [self.possible_box.item(x).text() for x in range(self.possible_box.count())]
-        self.possible_box.clear()
+        self.update_list()
 
-        sorted_words = sort_by_usage(currently_legal_words, common_words)
-        for w in sorted_words:
-            self.possible_box.addItem(w)
+    def hard_mode_callback(self):
+        self.update_list()
 
 
     def letter_entered_callback(self):
         s = self.letter_entry_box.text()
-        if len(s) > 5:
+        if len(s) > WORD_LEN:
             self.entry_status_box.setText('Too many letters')
             self.letter_entry_box.setText(s[:-1])
             return
@@ -364,6 +465,10 @@ class ApplicationWindow(QtWidgets.QMainWindow):
         self.letter_entry_box.setText(s)
         self.letter_entry_box.setFocus()
 
+    def suggestion_clicked_callback(self, item):
+        self.letter_entry_box.setText(item.text().split()[0])
+        self.letter_entry_box.setFocus()
+
     def word_double_clicked_callback(self, item):
         self.word_clicked_callback(item)
         self.word_entered_callback()
@@ -371,7 +476,7 @@ class ApplicationWindow(QtWidgets.QMainWindow):
     def word_entered_callback(self):
 
         s = self.letter_entry_box.text()
-        if len(s) < 5:
+        if len(s) < WORD_LEN:
             self.entry_status_box.setText('Too few letters')
             return
 
@@ -382,26 +487,31 @@ class ApplicationWindow(QtWidgets.QMainWindow):
 
         self.letter_entry_box.clear()
 
-        row, col = self.box_ptr // 5, self.box_ptr % 5
+        row, col = self.box_ptr // WORD_LEN, self.box_ptr % WORD_LEN
         if row >= TURN_ROWS:
             return
 
-        for k in range(5):
+        for k in range(WORD_LEN):
             bx = self.box_row[row][k]
             bx.setText(s[k])
             bx.state = ST_REJECT
             bx.style_from_state()
 
-        self.box_ptr = min((row+1)*5, (TURN_ROWS-1)*5)
+        self.box_ptr = min((row+1)*WORD_LEN, (TURN_ROWS-1)*WORD_LEN)
 
         if self.current_wordle >= 0:
             self.set_state_callback()
         else:
             self.update_list()
 
-words = [line.strip().upper() for line in open("combined_wordlist.txt")]
-words = sorted(words[1:])  #get rid of first line comment
-common_words = [line.strip().upper() for line in open("common_words.txt")]
+combined = load_corpus('combined')
+words = combined.words
+common_words = load_corpus('common').words
+packed_words = combined.packed
+usage_rank = combined.usage_rank()
+scorer = WordScorer(words)
+guesses = combined.nrl_words()
+hard_index = GuessIndex(packed_words)
 
 
 print('Five letter words:', len(words))